@@ -1,12 +1,20 @@
 import streamlit as st
 import pandas as pd
+import altair
 from datetime import datetime
 
-# DiveLogic dosyasının varlığını kontrol et
+# Hesap modüllerinin varlığını kontrol et
 try:
-    from dive_logic import DiveLogic
-except ImportError:
-    st.error("HATA: 'dive_logic.py' dosyası bulunamadı! Lütfen GitHub'a bu dosyayı da yükleyin.")
+    from plan_engine import PlanEngine
+    from dive_log_store import open_store
+    import instrumentation
+    from gas_engine import team_gas_plan
+    from compliance import check_egm_compliance, audit_log, RULES
+    from batch_planner import sweep
+    from data_storage import USN_REV7_DATA, ALTITUDE_CORRECTION, ALTITUDE_GROUPS, ASCENT_WAIT_TIMES
+except ImportError as e:
+    st.error(f"HATA: '{e.name}' modülü yüklenemedi! Proje dosyalarının (plan_engine.py, dive_logic.py, "
+             "data_storage.py vb.) GitHub'a yüklendiğini ve requirements.txt bağımlılıklarının kurulu olduğunu kontrol edin.")
 
 st.set_page_config(page_title="EGM Dalış Planlayıcı Pro", layout="wide", page_icon="🤿")
 
@@ -16,27 +24,48 @@ if 'last_group' not in st.session_state:
 if 'history' not in st.session_state:
     st.session_state['history'] = []
 
-def check_egm_compliance(system, d_m, d_f, gas, pers):
-    alerts = []
-    if system == "SCUBA":
-        if d_f > 140: alerts.append("❌ KRİTİK: Scuba ile 140 ft (42m) sınırı aşılamaz!")
-        if pers < 3: alerts.append("👥 EKİP: En az 3 personel bulunmalıdır.")
-    elif system == "SİDS":
-        if d_f > 190: alerts.append("❌ KRİTİK: SİDS 190 ft (58m) sınırı aşıldı!")
-        if pers < 4: alerts.append("👥 EKİP: En az 4 personel gereklidir.")
-        if d_f > 33 and pers < 7: alerts.append("👥 EKİP: 10m üzeri derinlikte ekip en az 7 kişi olmalıdır.")
-    elif system == "NİTROKS":
-        try:
-            o2 = int(gas)
-            if o2 == 32 and d_m > 33: alerts.append("❌ MEVZUAT: %32 Nitroks sınırı 33 metredir.")
-            if o2 == 36 and d_m > 28: alerts.append("❌ MEVZUAT: %36 Nitroks sınırı 28 metredir.")
-        except: pass
-    return alerts
+# --- PAYLAŞILAN KAYNAKLAR (Tüm oturumlar için tek kopya) ---
+@st.cache_resource
+def get_plan_engine():
+    # Derlenmiş tablolar dive_logic yüklenirken bir kez kurulur; motor ve LRU önbelleği sunucu genelinde paylaşılır
+    return PlanEngine(check_egm_compliance)
+
+@st.cache_resource
+def get_log_store():
+    return open_store()
+
+@st.cache_data(max_entries=256)
+def stops_table(stops):
+    return pd.DataFrame([{"Derinlik (ft)": k, "Süre (dk)": v} for k, v in stops])
+
+# Karar yüzeyleri tek vektörel geçişte hesaplanır ve tüm oturumlar arasında paylaşılır
+@st.cache_data(max_entries=32, show_spinner="Karar yüzeyi hesaplanıyor...")
+def depth_time_surface(max_time, step, altitude_ft):
+    depths = sorted(d for d in USN_REV7_DATA if d <= 190)
+    frame = sweep(depths, range(step, max_time + 1, step), altitude_ft)
+    frame["depth_ft"] = frame["depth_ft"].astype(int)
+    frame["time_from"] = frame["bottom_time"] - step
+    frame["status"] = "NDL içi"
+    frame.loc[frame["is_deco"] & frame["deco_row_found"], "status"] = "Dekompresyonlu"
+    frame.loc[frame["is_deco"] & ~frame["deco_row_found"], "status"] = "Tablo dışı (Z)"
+    return frame[["depth_ft", "time_from", "bottom_time", "equiv_depth_ft", "ndl", "final_group", "status", "total_stop_time"]]
+
+@st.cache_data(max_entries=4)
+def depth_altitude_surface():
+    altitudes = [0] + sorted(ALTITUDE_CORRECTION)
+    frame = sweep(range(1, 191), 0, altitudes)
+    frame["depth_ft"] = frame["depth_ft"].astype(int)
+    frame["altitude_ft"] = frame["altitude_ft"].astype(int)
+    return frame[["depth_ft", "altitude_ft", "equiv_depth_ft", "ndl"]]
+
+engine = get_plan_engine()
+log_store = get_log_store()
+instrumentation.enable_from_env()
 
 st.title("🤿 US NAVY Rev 7 / EGM Profesyonel Dalış Planlayıcı")
 st.markdown("---")
 
-tab1, tab2 = st.tabs(["🟦 İLK DALIŞ PLANI", "🟩 MÜKERRER DALIŞ ANALİZİ"])
+tab1, tab2, tab3, tab4 = st.tabs(["🟦 İLK DALIŞ PLANI", "🟩 MÜKERRER DALIŞ ANALİZİ", "🛠️ TANILAMA", "🗺️ KARAR HARİTASI"])
 
 # --- TAB 1: İLK DALIŞ ---
 with tab1:
@@ -55,21 +84,25 @@ with tab1:
         st.write("---")
         t_v = st.number_input("Tüp Hacmi (L)", value=12, key="tv1")
         t_p = st.number_input("Başlangıç Basıncı (Bar)", value=200, key="tp1")
+        diver = st.text_input("Dalgıç", value="", key="diver1")
+        log_it = st.checkbox("Raporu log'a kaydet", value=True, key="log1")
         
         calc_btn = st.button("HESAPLA VE RAPORLA", type="primary", use_container_width=True)
 
     with c2:
         if calc_btn:
             st.subheader("📋 DETAYLI DALIŞ RAPORU")
+            with instrumentation.timed("app.single_dive_report"):
+                report = engine.single_dive(sys_type, d_m, b_t, alt, gas, pers, t_v, t_p)
             
             # Mevzuat
-            alerts = check_egm_compliance(sys_type, d_m, d_f, gas, pers)
+            alerts = report["alerts"]
             for a in alerts: st.error(a)
             if not alerts: st.success("✅ EGM MEVZUATINA UYGUNDUR")
 
             # Hesaplamalar
-            equiv_d = DiveLogic.get_altitude_correction(d_f, alt)
-            ndl = DiveLogic.get_ndl(equiv_d)
+            equiv_d = report["equiv_depth"]
+            ndl = report["ndl"]
             
             # Sonuç Kutuları
             r1, r2, r3 = st.columns(3)
@@ -77,34 +110,70 @@ with tab1:
             r2.metric("NDL Sınırı", f"{ndl} dk")
             
             # Deko Detayları
-            if b_t > ndl:
+            if report["is_deco"]:
                 st.warning("⚠️ DURUM: DEKOMPRESYONLU DALIŞ")
-                deco = DiveLogic.get_deco_details(equiv_d, b_t)
-                if deco and "stops" in deco:
+                if report["deco_found"]:
                     st.write("**Deko Durakları ve Süreleri:**")
-                    stops_data = [{"Derinlik (ft)": k, "Süre (dk)": v} for k, v in deco["stops"].items() if v > 0]
-                    st.table(pd.DataFrame(stops_data))
-                    group = deco["final_group"]
-                else: group = "Z"
+                    with instrumentation.timed("app.render_stop_table"):
+                        st.table(stops_table(report["stops"]))
             else:
                 st.info("DURUM: GÜVENLİ (NDL DAHİLİ)")
-                group = DiveLogic.get_group_letter(equiv_d, b_t)
+            group = report["group"]
 
             r3.metric("Dalış Sonu Grubu", group)
             
             # Hava Analizi
             st.write("---")
             st.write("📊 **GAZ TÜKETİM ANALİZİ**")
-            ata = (d_f / 33) + 1
-            usage = 20 * ata * b_t
-            rem = (t_v * t_p) - usage
+            total_gas = report["total_gas"]
+            usage = report["gas_usage"]
+            rem = report["gas_remaining"]
             
             h1, h2 = st.columns(2)
             h1.write(f"Toplam Mevcut Gaz: **{t_v*t_p} Litre**")
             h1.write(f"Tahmini Tüketim: **{usage:.0f} Litre**")
-            h2.progress(max(0.0, min(1.0, rem/(t_v*t_p))), text=f"Kalan Gaz: {max(0, rem):.0f} L")
+            h2.progress(max(0.0, min(1.0, rem/total_gas)) if total_gas else 0.0, text=f"Kalan Gaz: {max(0, rem):.0f} L")
             
             st.session_state['last_group'] = group
+            st.session_state['team_dive'] = (d_m, b_t, dict(report["stops"]))
+            st.caption("Tüketim iniş, dip, çıkış ve deko duraklarını kapsar (SAC 20 L/dk).")
+
+            if log_it:
+                with instrumentation.timed("app.log_write"):
+                    log_store.write({
+                        "timestamp": datetime.now(), "diver": diver.strip(), "dive_type": "ILK DALIS",
+                        "system": sys_type, "depth_ft": d_f, "depth_m": d_m, "bottom_time": b_t, "altitude_ft": alt,
+                        "gas_o2": gas, "personnel": pers, "group_letter": group, "rnt": 0,
+                        "is_deco": report["is_deco"], "deco_stops": report["stops"], "alerts": alerts,
+                    })
+
+    # Ekip x tüp yapılandırması gaz planı (tek vektörel hesap)
+    with st.expander("👥 EKİP GAZ PLANI (Dalgıç x Tüp)"):
+        sac_txt = st.text_input("Dalgıç SAC oranları (L/dk, virgülle)", value="20, 22, 18, 25", key="team_sac")
+        tank_txt = st.text_input("Tüpler (Hacim x Basınç, virgülle)", value="12x200, 15x200, 12x232", key="team_tanks")
+        # Son hesaplanan raporun profili kullanılır; her yeniden çalıştırmada dalış tekrar hesaplanmaz
+        team_dive = st.session_state.get('team_dive')
+        if team_dive is None:
+            st.info("Ekip gaz planı için önce dalışı HESAPLA VE RAPORLA ile hesaplayın.")
+        else:
+            team_d_m, team_b_t, team_stops = team_dive
+            st.caption(f"Son hesaplanan dalış: {team_d_m:g} m, {team_b_t} dk")
+            try:
+                sacs = [float(x) for x in sac_txt.split(",") if x.strip()]
+                tanks = [tuple(float(v) for v in t.lower().split("x")) for t in tank_txt.split(",") if t.strip()]
+                plan = team_gas_plan(team_d_m * 3.28084, team_b_t, sacs, [t[0] for t in tanks], [t[1] for t in tanks],
+                                     stops=team_stops)
+                margin_df = pd.DataFrame(
+                    plan["reserve_margin"].round(0),
+                    index=[f"Dalgıç {i + 1} ({s:g} L/dk)" for i, s in enumerate(sacs)],
+                    columns=[f"{v:g} L x {p:g} bar" for v, p in tanks],
+                )
+                st.write("**Rezerv Payı (L)** — kalan gaz eksi 1/3 rezerv; negatif değer yetersizdir.")
+                st.dataframe(margin_df, use_container_width=True)
+                if not plan["sufficient"].all():
+                    st.warning(f"⚠️ {int((~plan['sufficient']).sum())} dalgıç/tüp eşleşmesinde rezerv bozuluyor.")
+            except (ValueError, IndexError):
+                st.error("Hatalı format! SAC için '20, 22', tüpler için '12x200, 15x232' şeklinde girin.")
 
 # --- TAB 2: MÜKERRER DALIŞ ---
 with tab2:
@@ -129,13 +198,13 @@ with tab2:
                 h, m = map(int, si_val.split(':'))
                 total_si = h * 60 + m
                 
-                # 1. SI Sonrası Yeni Grup
-                new_g = DiveLogic.get_new_group_after_si(current_g, total_si)
-                # 2. RNT Hesabı
-                rnt = DiveLogic.calculate_rnt(next_d_f, new_g)
-                total_time = rnt + next_t
-                # 3. NDL Hesabı
-                next_ndl = DiveLogic.get_ndl(next_d_f)
+                # 1. SI Sonrası Yeni Grup, 2. RNT Hesabı, 3. NDL Hesabı
+                with instrumentation.timed("app.repetitive_report"):
+                    rep = engine.repetitive_dive(st.session_state.get('sys1', 'SCUBA'), current_g, total_si, next_d_m, next_t)
+                new_g = rep["new_group"]
+                rnt = rep["rnt"]
+                total_time = rep["total_time"]
+                next_ndl = rep["ndl"]
                 
                 st.markdown(f"### 🏁 Mükerrer Analiz Sonuçları")
                 
@@ -143,22 +212,144 @@ with tab2:
                 m1.metric("Yeni Grup", new_g)
                 m2.metric("RNT (Artık Azot)", f"{rnt} dk")
                 m3.metric("Toplam Hesap Zamanı", f"{total_time} dk")
+                st.caption(f"Dalış Sonu Grup: {rep['final_group']}")
+                
+                # Maksimum izinli değerler (ters tablo sorguları)
+                min_si = rep["min_surface_interval"]
+                x1, x2 = st.columns(2)
+                x1.metric("Maks. İzinli Dip Zamanı", f"{rep['max_bottom_time']} dk")
+                x2.metric("NDL İçin Min. Yüzey Aralığı", f"{min_si // 60}:{min_si % 60:02d}" if min_si is not None else "Mümkün değil")
                 
                 st.write("---")
                 
-                if total_time > next_ndl:
+                if rep["is_deco"]:
                     st.error(f"⚠️ DİKKAT: Toplam süre ({total_time} dk), NDL sınırını ({next_ndl} dk) aşıyor!")
                     st.write("**Önerilen Deko Planı:**")
-                    deco_rep = DiveLogic.get_deco_details(next_d_f, total_time)
-                    if deco_rep:
-                        df_rep = pd.DataFrame([{"Derinlik (ft)": k, "Süre (dk)": v} for k, v in deco_rep["stops"].items() if v > 0])
-                        st.table(df_rep)
+                    if rep["deco_found"]:
+                        with instrumentation.timed("app.render_stop_table"):
+                            st.table(stops_table(rep["stops"]))
                 else:
                     st.success(f"✅ Güvenli: Toplam süre NDL sınırı olan {next_ndl} dk içerisinde.")
                 
                 # Mevzuat Tekrar Kontrol
-                rep_alerts = check_egm_compliance(st.session_state.get('sys1', 'SCUBA'), next_d_m, next_d_f, "21", 4)
-                for ra in rep_alerts: st.warning(ra)
+                for ra in rep["alerts"]: st.warning(ra)
+
+                if st.session_state.get('log1', True):
+                    with instrumentation.timed("app.log_write"):
+                        log_store.write({
+                            "timestamp": datetime.now(), "diver": st.session_state.get('diver1', '').strip(),
+                            "dive_type": "MUKERRER DALIS", "system": st.session_state.get('sys1', 'SCUBA'),
+                            "depth_ft": next_d_f, "depth_m": next_d_m, "bottom_time": next_t, "gas_o2": "21",
+                            "personnel": 4, "group_letter": rep["final_group"], "rnt": rnt, "is_deco": rep["is_deco"],
+                            "deco_stops": rep["stops"], "alerts": rep["alerts"],
+                        })
 
             except Exception as e:
-                st.error("Hatalı format! Lütfen yüzey aralığını 01:30 şeklinde girin.")
\ No newline at end of file
+                st.error("Hatalı format! Lütfen yüzey aralığını 01:30 şeklinde girin.")
+
+# --- TAB 3: TANILAMA ---
+with tab3:
+    st.subheader("Performans Tanılama")
+    st.caption("Ölçüm sunucu genelindedir; DALIS_PROFILE=1 ile başlangıçta da açılabilir.")
+    d1, d2, d3 = st.columns(3)
+    if d1.button("Ölçümü Aç", disabled=instrumentation.is_enabled()):
+        instrumentation.enable()
+    if d2.button("Ölçümü Kapat", disabled=not instrumentation.is_enabled()):
+        instrumentation.disable()
+    if d3.button("Sayaçları Sıfırla"):
+        instrumentation.reset()
+
+    diag = instrumentation.snapshot()
+    st.write(f"Durum: **{'AÇIK' if diag['enabled'] else 'KAPALI'}**")
+    if diag["functions"]:
+        st.dataframe(pd.DataFrame.from_dict(diag["functions"], orient="index"), use_container_width=True)
+    else:
+        st.info("Henüz ölçüm verisi yok.")
+    e1, e2 = st.columns(2)
+    e1.download_button("JSON İndir", instrumentation.to_json(), file_name="dalis_profile.json", mime="application/json")
+    e2.download_button("Prometheus İndir", instrumentation.to_prometheus(), file_name="dalis_metrics.prom", mime="text/plain")
+
+    st.divider()
+    st.subheader("📋 Mevzuat Denetimi")
+    st.caption("Kayıt deposundaki tüm dalışları kural tablosuna göre tek geçişte yeniden denetler.")
+    if st.button("Kayıtları Denetle", key="audit_logs"):
+        with instrumentation.timed("app.audit_logs"):
+            result = audit_log(log_store)
+        a1, a2 = st.columns(2)
+        a1.metric("Denetlenen Kayıt", result["records"])
+        a2.metric("Engelleyici İhlalli Kayıt", result["flagged"])
+        st.dataframe(pd.DataFrame(
+            [{"Sistem": r.system, "Kural": r.id, "İhlal": result["by_rule"][r.id], "Mesaj": r.message} for r in RULES]
+        ), use_container_width=True, hide_index=True)
+
+# --- TAB 4: KARAR HARİTASI ---
+with tab4:
+    st.subheader("Derinlik x Dip Zamanı")
+    h1, h2, h3 = st.columns(3)
+    max_time = h1.select_slider("Dip Zamanı Aralığı (dk)", options=[60, 120, 180, 240, 360, 480, 720], value=240, key="hm_time")
+    hm_alt = h2.selectbox("İrtifa (ft)", [0] + sorted(ALTITUDE_CORRECTION), key="hm_alt")
+    color_by = h3.radio("Renk", ["Dalış Sonu Grup", "Deko Durumu", "Toplam Durak Süresi"], key="hm_color")
+
+    # Haritalar yalnızca istenince çizilir; diğer sekmelerdeki her yeniden çalıştırmada grafik üretilmez
+    show_maps = st.toggle("Haritaları Göster", value=False, key="hm_show")
+    if show_maps:
+        with instrumentation.timed("app.depth_time_surface"):
+            surface = depth_time_surface(max_time, 1 if max_time <= 360 else 2, hm_alt)
+        if color_by == "Dalış Sonu Grup":
+            color = altair.Color("final_group:O", title="Grup", sort=sorted(surface["final_group"].unique()),
+                              scale=altair.Scale(scheme="turbo"))
+        elif color_by == "Deko Durumu":
+            color = altair.Color("status:N", title="Durum", scale=altair.Scale(
+                domain=["NDL içi", "Dekompresyonlu", "Tablo dışı (Z)"], range=["#2E7D32", "#F9A825", "#C62828"]))
+        else:
+            color = altair.Color("total_stop_time:Q", title="Durak (dk)", scale=altair.Scale(scheme="orangered"))
+        st.altair_chart(altair.Chart(surface).mark_rect().encode(
+            x=altair.X("time_from:Q", title="Dip Zamanı (dk)", scale=altair.Scale(domain=[0, max_time], nice=False)),
+            x2="bottom_time:Q",
+            y=altair.Y("depth_ft:O", title="Derinlik (ft)"),
+            color=color,
+            tooltip=[
+                altair.Tooltip("depth_ft:O", title="Derinlik (ft)"),
+                altair.Tooltip("bottom_time:Q", title="Dip Zamanı (dk)"),
+                altair.Tooltip("equiv_depth_ft:Q", title="Eşdeğer Derinlik (ft)", format=".1f"),
+                altair.Tooltip("ndl:Q", title="NDL (dk)"),
+                altair.Tooltip("final_group:N", title="Grup"),
+                altair.Tooltip("status:N", title="Durum"),
+                altair.Tooltip("total_stop_time:Q", title="Toplam Durak (dk)"),
+            ],
+        ).properties(height=480), use_container_width=True)
+        st.caption("Derinlikler Tablo 9-7 satırlarıdır; ara derinlikler bir alt satırın (daha derin) değerini alır.")
+
+        st.subheader("Derinlik x İrtifa (NDL)")
+        ndl_surface = depth_altitude_surface()
+        st.altair_chart(altair.Chart(ndl_surface).mark_rect().encode(
+            x=altair.X("altitude_ft:O", title="İrtifa (ft)"),
+            y=altair.Y("depth_ft:O", title="Derinlik (ft)", axis=altair.Axis(values=list(range(10, 191, 10)))),
+            color=altair.Color("ndl:Q", title="NDL (dk)", scale=altair.Scale(scheme="redyellowgreen", type="symlog")),
+            tooltip=[
+                altair.Tooltip("depth_ft:O", title="Derinlik (ft)"),
+                altair.Tooltip("altitude_ft:O", title="İrtifa (ft)"),
+                altair.Tooltip("equiv_depth_ft:Q", title="Eşdeğer Derinlik (ft)", format=".1f"),
+                altair.Tooltip("ndl:Q", title="NDL (dk)"),
+            ],
+        ).properties(height=480), use_container_width=True)
+        st.caption("NDL 0: eşdeğer derinlik Tablo 9-7 sınırını (190 ft) aşıyor.")
+
+    with st.expander("📐 İrtifa Tabloları (Tablo 9-5 / 9-6)"):
+        st.markdown("**Rakıma varışta başlangıç grubu (Tablo 9-5)**")
+        st.dataframe(pd.DataFrame({"İrtifa (ft)": list(ALTITUDE_GROUPS), "Grup": list(ALTITUDE_GROUPS.values())}),
+                     hide_index=True)
+        st.markdown("**Dalış sonrası rakıma çıkmadan önce bekleme (dk, Tablo 9-6)**")
+        st.dataframe(pd.DataFrame.from_dict(
+            ASCENT_WAIT_TIMES, orient="index",
+            columns=[f"Kademe {i + 1}" for i in range(len(next(iter(ASCENT_WAIT_TIMES.values()))))],
+        ), use_container_width=True)
+
+# --- ÖNBELLEK DURUMU ---
+with st.sidebar:
+    st.subheader("⚙️ Plan Önbelleği")
+    cache_stats = engine.stats()
+    s1, s2 = st.columns(2)
+    s1.metric("İsabet", cache_stats["hits"])
+    s2.metric("Iska", cache_stats["misses"])
+    st.caption(f"Kayıt: {cache_stats['size']} / {cache_stats['maxsize']}")
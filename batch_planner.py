@@ -0,0 +1,160 @@
+import numpy as np
+import pandas as pd
+from data_storage import USN_REV7_DATA, AIR_DECO_DATA, ALTITUDE_CORRECTION
+
+# ==========================================
+# TOPLU (VEKTÖREL) DALIŞ PLANLAMA
+# ==========================================
+# DiveLogic'in satır satır yaptığı sorguların NumPy karşılığı. Tablo kırılım
+# noktaları modül yüklenirken düz dizilere açılır; her sütun tek bir
+# searchsorted çağrısıyla çözülür. Sonuçlar app.py'deki "HESAPLA VE RAPORLA"
+# akışıyla birebir aynıdır.
+
+# Farklı derinlik satırlarını tek bir sıralı anahtar dizisinde tutmak için
+# satır indeksi bu aralıkla çarpılır (tablolardaki en büyük süre 9999 dk).
+_ROW_SPAN = 1_000_000.0
+
+# Tablo 9-4
+_ALT_STEPS = np.array(sorted(ALTITUDE_CORRECTION.keys()), dtype=float)
+_ALT_FACTORS = np.array([ALTITUDE_CORRECTION[a] for a in sorted(ALTITUDE_CORRECTION.keys())], dtype=float)
+
+# Tablo 9-7
+_NDL_DEPTHS = np.array(sorted(USN_REV7_DATA.keys()), dtype=float)
+_NDL_VALUES = np.array([USN_REV7_DATA[d]["ndl"] for d in sorted(USN_REV7_DATA.keys())], dtype=np.int64)
+
+_group_rows = [
+    (i, start, end, letter)
+    for i, d in enumerate(sorted(USN_REV7_DATA.keys()))
+    for start, end, letter in sorted(USN_REV7_DATA[d]["groups"])
+]
+_G_ROW = np.array([r[0] for r in _group_rows], dtype=np.int64)
+_G_START = np.array([r[1] for r in _group_rows], dtype=float)
+_G_END = np.array([r[2] for r in _group_rows], dtype=float)
+_G_LETTER = np.array([r[3] for r in _group_rows], dtype='<U1')
+_G_KEY = _G_ROW * _ROW_SPAN + _G_START
+
+# Tablo 9-9
+_DECO_DEPTHS = np.array(sorted(AIR_DECO_DATA.keys()), dtype=float)
+STOP_DEPTHS = sorted({s for rows in AIR_DECO_DATA.values() for row in rows.values() for s in row["stops"]}, reverse=True)
+
+_deco_rows = [
+    (i, t, AIR_DECO_DATA[d][t])
+    for i, d in enumerate(sorted(AIR_DECO_DATA.keys()))
+    for t in sorted(AIR_DECO_DATA[d].keys())
+]
+_D_ROW = np.array([r[0] for r in _deco_rows], dtype=np.int64)
+_D_KEY = _D_ROW * _ROW_SPAN + np.array([r[1] for r in _deco_rows], dtype=float)
+_D_FINAL = np.array([r[2]["final_group"] for r in _deco_rows], dtype='<U1')
+_D_STOPS = np.array([[r[2]["stops"].get(s, 0) for s in STOP_DEPTHS] for r in _deco_rows], dtype=np.int64)
+
+del _group_rows, _deco_rows
+
+
+def altitude_correction(depth_ft, altitude_ft):
+    """DiveLogic.get_altitude_correction'ın dizi karşılığı."""
+    depth_ft = np.asarray(depth_ft, dtype=float)
+    altitude_ft = np.asarray(altitude_ft, dtype=float)
+    idx = np.minimum(np.searchsorted(_ALT_STEPS, altitude_ft, side='left'), len(_ALT_STEPS) - 1)
+    return np.where(altitude_ft <= 0, depth_ft, depth_ft * _ALT_FACTORS[idx])
+
+
+def ndl(depth_ft):
+    """DiveLogic.get_ndl'in dizi karşılığı (tablo dışı derinlikte 0)."""
+    row = np.searchsorted(_NDL_DEPTHS, np.asarray(depth_ft, dtype=float), side='left')
+    inside = row < len(_NDL_DEPTHS)
+    return np.where(inside, _NDL_VALUES[np.minimum(row, len(_NDL_DEPTHS) - 1)], 0)
+
+
+def group_letter(depth_ft, bottom_time):
+    """DiveLogic.get_group_letter'ın dizi karşılığı (eşleşme yoksa 'Z')."""
+    depth_ft, bottom_time = np.broadcast_arrays(np.asarray(depth_ft, dtype=float), np.asarray(bottom_time, dtype=float))
+    row = np.searchsorted(_NDL_DEPTHS, depth_ft, side='left')
+    key = row * _ROW_SPAN + np.clip(bottom_time, -1.0, _ROW_SPAN / 2)
+    idx = np.clip(np.searchsorted(_G_KEY, key, side='right') - 1, 0, len(_G_KEY) - 1)
+    hit = (row < len(_NDL_DEPTHS)) & (_G_ROW[idx] == row) & (_G_START[idx] <= bottom_time) & (bottom_time <= _G_END[idx])
+    return np.where(hit, _G_LETTER[idx], 'Z')
+
+
+def deco_lookup(depth_ft, bottom_time):
+    """
+    DiveLogic.get_deco_details'in dizi karşılığı.
+    (satır bulundu mu, final grup, STOP_DEPTHS sırasıyla durak süreleri) döner.
+    """
+    depth_ft, bottom_time = np.broadcast_arrays(np.asarray(depth_ft, dtype=float), np.asarray(bottom_time, dtype=float))
+    row = np.searchsorted(_DECO_DEPTHS, depth_ft, side='left')
+    key = row * _ROW_SPAN + np.clip(bottom_time, -1.0, _ROW_SPAN / 2)
+    pos = np.searchsorted(_D_KEY, key, side='left')
+    idx = np.minimum(pos, len(_D_KEY) - 1)
+    hit = (row < len(_DECO_DEPTHS)) & (pos < len(_D_KEY)) & (_D_ROW[idx] == row)
+    stops = np.where(hit[..., None], _D_STOPS[idx], 0)
+    return hit, np.where(hit, _D_FINAL[idx], 'Z'), stops
+
+
+def plan_batch(depth_ft, bottom_time=None, altitude_ft=0):
+    """
+    Çok sayıda dalışı tek seferde planlar.
+
+    Diziler (liste / NumPy / pandas Series) ya da 'depth_ft', 'bottom_time' ve
+    isteğe bağlı 'altitude_ft' sütunları olan bir DataFrame alır. Her satır için
+    eşdeğer derinlik, NDL, Tablo 9-7 grubu, deko durakları ve dalış sonu (final)
+    grubunu içeren bir DataFrame döner. DataFrame verilmezse bottom_time zorunludur.
+    """
+    index = None
+    if isinstance(depth_ft, pd.DataFrame):
+        frame = depth_ft
+        index = frame.index
+        depth_ft = frame["depth_ft"].to_numpy(dtype=float)
+        bottom_time = frame["bottom_time"].to_numpy(dtype=float)
+        altitude_ft = frame["altitude_ft"].to_numpy(dtype=float) if "altitude_ft" in frame else 0
+    elif isinstance(depth_ft, pd.Series):
+        index = depth_ft.index
+    if bottom_time is None:
+        raise ValueError("DataFrame verilmediğinde bottom_time gerekli.")
+
+    depth_ft, bottom_time, altitude_ft = np.broadcast_arrays(
+        np.asarray(depth_ft, dtype=float).ravel(),
+        np.asarray(bottom_time, dtype=float).ravel(),
+        np.asarray(altitude_ft, dtype=float).ravel(),
+    )
+
+    equiv = altitude_correction(depth_ft, altitude_ft)
+    limit = ndl(equiv)
+    is_deco = bottom_time > limit
+    group = group_letter(equiv, bottom_time)
+    has_row, deco_final, stops = deco_lookup(equiv, bottom_time)
+
+    # Tablo 9-9'da satır yoksa app.py gibi en riskli grup ('Z') kabul edilir
+    final_group = np.where(is_deco, deco_final, group)
+    stops = np.where(is_deco[:, None], stops, 0)
+
+    columns = {
+        "equiv_depth_ft": equiv,
+        "ndl": limit,
+        "is_deco": is_deco,
+        "group": group,
+    }
+    for k, s in enumerate(STOP_DEPTHS):
+        columns[f"stop_{s}ft"] = stops[:, k]
+    columns["total_stop_time"] = stops.sum(axis=1)
+    columns["deco_row_found"] = is_deco & has_row
+    columns["final_group"] = final_group
+    return pd.DataFrame(columns, index=index)
+
+
+def sweep(depth_ft, bottom_time, altitude_ft=0):
+    """
+    Derinlik x dip zamanı x irtifa ızgarasının tamamını tek plan_batch çağrısıyla
+    çözer. Her hücre bir satır olmak üzere giriş sütunları (depth_ft, bottom_time,
+    altitude_ft) eklenmiş uzun biçimli bir DataFrame döner.
+    """
+    dd, tt, aa = np.meshgrid(
+        np.asarray(depth_ft, dtype=float).ravel(),
+        np.asarray(bottom_time, dtype=float).ravel(),
+        np.asarray(altitude_ft, dtype=float).ravel(),
+        indexing="ij",
+    )
+    frame = plan_batch(dd.ravel(), tt.ravel(), aa.ravel())
+    frame.insert(0, "depth_ft", dd.ravel())
+    frame.insert(1, "bottom_time", tt.ravel())
+    frame.insert(2, "altitude_ft", aa.ravel())
+    return frame
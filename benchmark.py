@@ -0,0 +1,519 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from functools import lru_cache
+from dive_logic import DiveLogic
+from dive_series import iter_series
+from dive_log_store import DiveLogStore
+from plan_engine import PlanEngine
+from compliance import check_egm_compliance, audit, RULES
+from data_storage import (
+    USN_REV7_DATA, SURFACE_INTERVAL_DATA, RNT_DATA,
+    AIR_DECO_DATA, ALTITUDE_CORRECTION
+)
+
+# ==========================================
+# PERFORMANS ÖLÇÜMÜ VE DOĞRULUK KONTROLÜ
+# ==========================================
+# Kullanım:
+#   python benchmark.py                         # doğrulama + ölçüm, sonucu yazdırır
+#   python benchmark.py --save-baseline b.json  # sonucu temel (baseline) olarak kaydeder
+#   python benchmark.py --compare b.json        # temele göre gerileme varsa çıkış kodu 1
+#
+# Doğrulama (oracle), optimize edilmiş tüm yolları aşağıdaki referans uygulamayla
+# (tabloları her çağrıda sıralayan ilk DiveLogic) tablo alanının tamamında karşılaştırır.
+
+DEFAULT_BASELINE = "benchmark_baseline.json"
+DEFAULT_THRESHOLD = 0.25
+GROUP_LETTERS = list(RNT_DATA.keys())
+
+
+class ReferenceDiveLogic:
+    """Optimizasyon öncesi DiveLogic; doğruluk karşılaştırması için değiştirilmeden tutulur."""
+
+    @staticmethod
+    def get_altitude_correction(depth_feet, altitude_feet):
+        if altitude_feet <= 0:
+            return depth_feet
+        sorted_altitudes = sorted(ALTITUDE_CORRECTION.keys())
+        target_alt = next((alt for alt in sorted_altitudes if altitude_feet <= alt), sorted_altitudes[-1])
+        factor = ALTITUDE_CORRECTION.get(target_alt, 1.0)
+        return depth_feet * factor
+
+    @staticmethod
+    def get_ndl(depth_feet):
+        depth_list = sorted(USN_REV7_DATA.keys())
+        target_depth = next((d for d in depth_list if d >= depth_feet), None)
+        if target_depth:
+            return USN_REV7_DATA[target_depth]["ndl"]
+        return 0
+
+    @staticmethod
+    def get_deco_details(depth_feet, bottom_time):
+        depth_list = sorted(AIR_DECO_DATA.keys())
+        target_depth = next((d for d in depth_list if d >= depth_feet), None)
+        if target_depth and target_depth in AIR_DECO_DATA:
+            times = sorted(AIR_DECO_DATA[target_depth].keys())
+            target_time = next((t for t in times if t >= bottom_time), None)
+            if target_time:
+                return AIR_DECO_DATA[target_depth][target_time]
+        return None
+
+    @staticmethod
+    def get_group_letter(depth_feet, bottom_time):
+        depth_list = sorted(USN_REV7_DATA.keys())
+        target_depth = next((d for d in depth_list if d >= depth_feet), None)
+        if target_depth:
+            for start, end, letter in USN_REV7_DATA[target_depth]["groups"]:
+                if start <= bottom_time <= end:
+                    return letter
+        return 'Z'
+
+    @staticmethod
+    def get_new_group_after_si(old_group, interval_minutes):
+        if old_group not in SURFACE_INTERVAL_DATA:
+            return old_group
+        for start_str, end_str, new_letter in SURFACE_INTERVAL_DATA[old_group]:
+            h1, m1 = map(int, start_str.split(':'))
+            h2, m2 = map(int, end_str.split(':'))
+            if (h1 * 60 + m1) <= interval_minutes <= (h2 * 60 + m2):
+                return new_letter
+        return 'A'
+
+    @staticmethod
+    def calculate_rnt(depth_feet, group_letter):
+        if group_letter in RNT_DATA:
+            depth_list = sorted(RNT_DATA[group_letter].keys())
+            target_depth = next((d for d in depth_list if d >= depth_feet), None)
+            if target_depth:
+                return RNT_DATA[group_letter][target_depth]
+        return 0
+
+
+def reference_plan(depth_feet, bottom_time, altitude_feet=0):
+    """app.py ilk dalış akışının referans karşılığı: (eşdeğer derinlik, NDL, final grup, {durak: süre})."""
+    R = ReferenceDiveLogic
+    equiv = R.get_altitude_correction(depth_feet, altitude_feet)
+    ndl = R.get_ndl(equiv)
+    stops = {}
+    if bottom_time > ndl:
+        deco = R.get_deco_details(equiv, bottom_time)
+        if deco and "stops" in deco:
+            group = deco["final_group"]
+            stops = {k: v for k, v in deco["stops"].items() if v > 0}
+        else: group = "Z"
+    else:
+        group = R.get_group_letter(equiv, bottom_time)
+    return equiv, ndl, group, stops
+
+
+def reference_compliance(dive_system, depth_m, depth_f, gas_o2, personnel):
+    """Kural tablosu öncesi (DiveApp) mevzuat kontrolü; doğruluk karşılaştırması için değiştirilmeden tutulur."""
+    alerts = []
+    if dive_system == "SCUBA":
+        if depth_f > 140: alerts.append("❌ KRİTİK: Scuba ile maksimum derinlik sınırı 140 ft (42m) aşılamaz!")
+        if personnel < 3: alerts.append("👥 EKİP: Scuba dalışlarında en az 3 personel bulunmalıdır.")
+    elif dive_system == "SİDS":
+        if depth_f > 190: alerts.append("❌ KRİTİK: SİDS maksimum derinlik sınırı 190 ft (58m) aşıldı!")
+        elif depth_f > 140: alerts.append("⚠️ UYARI: 140 ft üzeri için en rütbeli kurbağa adamın yazılı izni şarttır.")
+        if personnel < 4: alerts.append("👥 EKİP: 10m altı için dahi en az 4 personel gereklidir.")
+        if depth_f > 33 and personnel < 7: alerts.append("👥 EKİP: 10m üzeri derinlikte ekip en az 7 kişi olmalıdır.")
+    elif dive_system == "NİTROKS":
+        try:
+            o2 = int(gas_o2)
+            if o2 == 32 and depth_m > 33: alerts.append("❌ MEVZUAT: %32 Nitroks için derinlik sınırı 33 metredir.")
+            if o2 == 36 and depth_m > 28: alerts.append("❌ MEVZUAT: %36 Nitroks için derinlik sınırı 28 metredir.")
+        except: pass
+        alerts.append("ℹ️ İlk nitroks dalışı max 150 dk olabilir.")
+    elif dive_system == "KDDS":
+        if depth_m > 91: alerts.append("❌ KRİTİK: KDDS maksimum derinlik sınırı 91m aşıldı!")
+        if depth_m > 42:
+            alerts.append("⚠️ 42m üzeri için en kıdemli personelin yazılı izni gerekir.")
+            alerts.append("🩺 KRİTİK: Sualtı hekimi ve tazyik odası bulundurulması zorunludur.")
+        if personnel < 4: alerts.append("👥 EKİP: KDDS için en az 4 personel gereklidir.")
+    return alerts
+
+
+# --- DOĞRULUK KONTROLÜ (ORACLE) ---
+
+def _domain(quick):
+    step = 2 if quick else 1
+    depths = [d / 2 for d in range(-4, 2 * 200 + 1, step)]
+    times = [t / 2 for t in range(-2, 2 * 240, step)] + list(range(240, 1500, 5 * step)) + [9999, 10000]
+    altitudes = [-100, 0, 1, 999, 1000, 1001, 2500, 5000, 7777, 10000, 10001, 15000]
+    intervals = [i / 2 for i in range(-2, 2 * 960, step)]
+    return depths, times, altitudes, intervals
+
+
+def _first_si_start(group):
+    """Tablo 9-8'de grubun ilk fasıla aralığının başlangıcı (dakika); grup tabloda yoksa None."""
+    if group not in SURFACE_INTERVAL_DATA:
+        return None
+    return min(int(s.split(":")[0]) * 60 + int(s.split(":")[1]) for s, _, _ in SURFACE_INTERVAL_DATA[group])
+
+
+def _last_si_end(group):
+    """Tablo 9-8'de grubun son fasıla aralığının sonu (dakika); bu süreden uzun fasıladan sonraki dalış mükerrer değildir."""
+    return max(int(e.split(":")[0]) * 60 + int(e.split(":")[1]) for _, e, _ in SURFACE_INTERVAL_DATA[group])
+
+
+@lru_cache(maxsize=None)
+def reference_min_surface_interval(group, depth_feet, planned_time):
+    """Ters sorgunun kaba kuvvet karşılığı: NDL içinde kalınan ilk fasıla, tablo dışı ise son aralık sonu + 1."""
+    R = ReferenceDiveLogic
+    ndl = R.get_ndl(depth_feet)
+    if planned_time > ndl:
+        return None
+    last_end = _last_si_end(group)
+    return next((si for si in range(10, last_end + 1)
+                 if R.calculate_rnt(depth_feet, R.get_new_group_after_si(group, si)) + planned_time <= ndl), last_end + 1)
+
+
+def reference_repetitive(prev_group, si_minutes, depth_feet, planned_time):
+    """
+    app.py mükerrer dalış akışının referans karşılığı:
+    (SI sonrası grup, RNT, final grup, {durak: süre}, maks. dip zamanı, min. fasıla).
+    Fasıla tablonun ilk aralığından kısaysa grup korunur, son aralığını aşıyorsa RNT sıfırdır.
+    """
+    R = ReferenceDiveLogic
+    first_si = _first_si_start(prev_group)
+    if first_si is not None and si_minutes < first_si:
+        new_group = prev_group
+    else:
+        new_group = R.get_new_group_after_si(prev_group, si_minutes)
+    rnt = R.calculate_rnt(depth_feet, new_group) if si_minutes <= _last_si_end(prev_group) else 0
+    total_time = rnt + planned_time
+    ndl = R.get_ndl(depth_feet)
+    stops = {}
+    if total_time > ndl:
+        deco = R.get_deco_details(depth_feet, total_time)
+        if deco and "stops" in deco:
+            group = deco["final_group"]
+            stops = {k: v for k, v in deco["stops"].items() if v > 0}
+        else: group = "Z"
+    else:
+        group = R.get_group_letter(depth_feet, total_time)
+    return (new_group, rnt, group, stops, max(0, ndl - rnt),
+            reference_min_surface_interval(prev_group, depth_feet, planned_time))
+
+
+def check_correctness(quick=False):
+    """Tüm optimize yolları referansla karşılaştırır; uyuşmazlık listesini döner."""
+    R, D = ReferenceDiveLogic, DiveLogic
+    depths, times, altitudes, intervals = _domain(quick)
+    failures = []
+
+    def expect(name, args, got, want):
+        if got != want and len(failures) < 50:
+            failures.append(f"{name}{args}: {got!r} != {want!r}")
+
+    for d in depths:
+        expect("get_ndl", (d,), D.get_ndl(d), R.get_ndl(d))
+        for a in altitudes:
+            expect("get_altitude_correction", (d, a), D.get_altitude_correction(d, a), R.get_altitude_correction(d, a))
+        for t in times:
+            expect("get_group_letter", (d, t), D.get_group_letter(d, t), R.get_group_letter(d, t))
+            expect("get_deco_details", (d, t), D.get_deco_details(d, t), R.get_deco_details(d, t))
+        for g in GROUP_LETTERS + ["P", "?"]:
+            expect("calculate_rnt", (d, g), D.calculate_rnt(d, g), R.calculate_rnt(d, g))
+    for g in GROUP_LETTERS + ["P", "?"]:
+        first_si = _first_si_start(g)
+        for i in intervals:
+            # Bilinçli fark: tablonun ilk aralığından kısa fasılada referans 'A' döner, yeni kural grubu korur
+            want = g if first_si is not None and i < first_si else R.get_new_group_after_si(g, i)
+            expect("get_new_group_after_si", (g, i), D.get_new_group_after_si(g, i), want)
+
+    # Ters sorgular: ileri yöndeki referans fonksiyonlarla kaba kuvvet arama
+    # Son aralığı aşan fasıladan sonraki dalış mükerrer değildir: RNT düşülmez
+    for g in GROUP_LETTERS:
+        last_end = _last_si_end(g)
+        for d in range(0, 200, 5):
+            ndl = R.get_ndl(d)
+            for planned in (0, 5, 10, 20, 40, 80):
+                want = reference_min_surface_interval(g, d, planned)
+                expect("get_min_surface_interval", (g, d, planned), D.get_min_surface_interval(g, d, planned), want)
+            for si in (10, 60, 180, 600, last_end, last_end + 1, 2000):
+                rnt = R.calculate_rnt(d, R.get_new_group_after_si(g, si)) if si <= last_end else 0
+                want = max(0, ndl - rnt)
+                expect("get_max_bottom_time", (d, g, si), D.get_max_bottom_time(d, g, si), want)
+
+    # Plan motoru (app.py ilk dalış raporu)
+    engine = PlanEngine(lambda *args: [], maxsize=0)
+    for d_m in range(0, 61, 3 if quick else 1):
+        for t in range(0, 240, 7 if quick else 3):
+            for a in (0, 3000):
+                report = engine.single_dive("SCUBA", d_m, t, a, "21", 4, 12, 200)
+                equiv, ndl, group, stops = reference_plan(d_m * 3.28084, t, a)
+                got = (report["equiv_depth"], report["ndl"], report["group"], dict(report["stops"]))
+                expect("PlanEngine.single_dive", (d_m, t, a), got, (equiv, ndl, group, stops))
+
+    # Plan motoru (app.py mükerrer dalış raporu)
+    for g in GROUP_LETTERS:
+        last_end = _last_si_end(g)
+        for d_m in range(3, 58, 6 if quick else 3):
+            for planned in (5, 20, 40, 80):
+                for si in (0, 5, 10, 60, 180, 600, last_end, last_end + 1, 2000):
+                    report = engine.repetitive_dive("SCUBA", g, si, d_m, planned)
+                    got = (report["new_group"], report["rnt"], report["final_group"], dict(report["stops"]),
+                           report["max_bottom_time"], report["min_surface_interval"])
+                    expect("PlanEngine.repetitive_dive", (g, si, d_m, planned), got,
+                           reference_repetitive(g, si, d_m * 3.28084, planned))
+
+    failures += _check_compliance(quick)
+    failures += _check_batch(quick)
+    failures += _check_grid(quick)
+    return failures
+
+
+def _compliance_cases(quick):
+    systems = ["SCUBA", "SİDS", "NİTROKS", "KDDS", "?"]
+    gases = ["21", "32", "36", " 32", "32.0", "", None]
+    for d_m in range(0, 101, 3 if quick else 1):
+        for d_f in (d_m * 3.28084, d_m * 3.28):
+            for system in systems:
+                for gas in gases:
+                    for pers in range(0, 9):
+                        yield system, d_m, d_f, gas, pers
+
+
+def _check_compliance(quick):
+    failures = []
+    for args in _compliance_cases(quick):
+        got, want = check_egm_compliance(*args), reference_compliance(*args)
+        if got != want:
+            failures.append(f"check_egm_compliance{args}: {got!r} != {want!r}")
+            if len(failures) >= 20:
+                return failures
+    # Toplu denetim sayıları, tek tek kontrolün mesaj sayımlarıyla aynı olmalı
+    cases = list(_compliance_cases(True))
+    records = [{"system": s, "depth_m": m, "depth_ft": f, "gas_o2": g, "personnel": p} for s, m, f, g, p in cases]
+    want = {rule.id: 0 for rule in RULES}
+    for s, m, f, g, p in cases:
+        for message in reference_compliance(s, m, f, g, p):
+            rule = next(r for r in RULES if r.system == s and r.message == message)
+            want[rule.id] += 1
+    got = audit(records)["by_rule"]
+    if got != want:
+        failures.append(f"audit: {got!r} != {want!r}")
+    return failures
+
+
+def _check_batch(quick):
+    try:
+        import numpy as np
+        from batch_planner import plan_batch
+    except ImportError:
+        print("  (numpy/pandas yok: plan_batch kontrolü atlandı)")
+        return []
+    depths, times, altitudes, _ = _domain(True)
+    dd, tt, aa = np.meshgrid(depths, times[::3 if quick else 1], [0, 1000, 4500, 12000], indexing="ij")
+    frame = plan_batch(dd.ravel(), tt.ravel(), aa.ravel())
+    failures = []
+    for k, (d, t, a) in enumerate(zip(dd.ravel(), tt.ravel(), aa.ravel())):
+        equiv, ndl, group, stops = reference_plan(float(d), float(t), float(a))
+        got = (frame["ndl"].iat[k], frame["final_group"].iat[k], frame["total_stop_time"].iat[k])
+        if got != (ndl, group, sum(stops.values())):
+            failures.append(f"plan_batch({d}, {t}, {a}): {got!r} != {(ndl, group, sum(stops.values()))!r}")
+            if len(failures) >= 20:
+                break
+    return failures
+
+
+def _check_grid(quick):
+    from decision_grid import DecisionGrid, build_grid
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = build_grid(os.path.join(tmp, "grid.bin"))
+        grid = DecisionGrid(path)
+        try:
+            for a in (0, 1000, 2500, 10000, 12000):
+                for d in range(0, grid.max_depth + 1, 3 if quick else 1):
+                    for t in range(0, grid.max_time + 1, 7 if quick else 1):
+                        equiv, ndl, group, stops = reference_plan(d, t, a)
+                        got = grid.plan(d, t, a)
+                        if (got[0], got[2], {k: v for k, v in got[3].items() if v > 0}) != (ndl, group, stops):
+                            failures.append(f"DecisionGrid.plan({d}, {t}, {a}): {got!r}")
+                            if len(failures) >= 20:
+                                return failures
+        finally:
+            grid.close()
+    return failures
+
+
+# --- ÖLÇÜM ---
+
+def _workload(n, seed=7):
+    """Saha dağılımına yakın rastgele girdiler: sığ/orta derinlik ağırlıklı, çoğunlukla deniz seviyesi."""
+    rnd = random.Random(seed)
+    rows = []
+    for _ in range(n):
+        depth = min(190.0, max(10.0, rnd.gauss(70, 35)))
+        time_ = max(1, int(rnd.expovariate(1 / 40)))
+        alt = 0 if rnd.random() < 0.8 else rnd.choice(list(ALTITUDE_CORRECTION.keys())) - rnd.randint(0, 999)
+        rows.append((depth, time_, alt, rnd.choice(GROUP_LETTERS), rnd.randint(10, 900)))
+    return rows
+
+
+def _measure(name, func, inputs, results, repeat=1, rounds=3):
+    """
+    Her çağrıyı ayrı ayrı zamanlar. Verim (işlem/sn) turların en iyisidir, gecikme
+    yüzdelikleri (p50/p99, µs) tüm turların örneklerinden hesaplanır.
+    """
+    clock = time.perf_counter_ns
+    for args in inputs[:100]:
+        func(*args)  # Isınma
+    samples = []
+    best = 0.0
+    for _ in range(rounds):
+        round_samples = []
+        for _ in range(repeat):
+            for args in inputs:
+                t0 = clock()
+                func(*args)
+                round_samples.append(clock() - t0)
+        elapsed = sum(round_samples) / 1e9
+        best = max(best, len(round_samples) / elapsed if elapsed else float("inf"))
+        samples += round_samples
+    samples.sort()
+    results[name] = {
+        "n": len(samples),
+        "ops_per_sec": best,
+        "p50_us": samples[len(samples) // 2] / 1e3,
+        "p99_us": samples[min(len(samples) - 1, int(len(samples) * 0.99))] / 1e3,
+    }
+
+
+def run_benchmarks(quick=False):
+    n = 2_000 if quick else 20_000
+    work = _workload(n)
+    results = {}
+
+    # DiveLogic statik metotları
+    _measure("get_altitude_correction", DiveLogic.get_altitude_correction, [(d, a) for d, _, a, _, _ in work], results)
+    _measure("get_ndl", DiveLogic.get_ndl, [(d,) for d, *_ in work], results)
+    _measure("get_group_letter", DiveLogic.get_group_letter, [(d, t) for d, t, *_ in work], results)
+    _measure("get_deco_details", DiveLogic.get_deco_details, [(d, t) for d, t, *_ in work], results)
+    _measure("get_new_group_after_si", DiveLogic.get_new_group_after_si, [(g, si) for *_, g, si in work], results)
+    _measure("calculate_rnt", DiveLogic.calculate_rnt, [(d, g) for d, _, _, g, _ in work], results)
+    _measure("get_max_bottom_time", DiveLogic.get_max_bottom_time, [(d, g, si) for d, _, _, g, si in work], results)
+    _measure("get_min_surface_interval", DiveLogic.get_min_surface_interval, [(g, d, t) for d, t, _, g, _ in work], results)
+
+    # app.py sekme akışları biçiminde tam raporlar
+    cold = PlanEngine(lambda *args: [], maxsize=0)
+    warm = PlanEngine(lambda *args: [])
+    single = [("SCUBA", round(d / 3.28084, 1), t, a, "21", 4, 12, 200) for d, t, a, _, _ in work]
+    repetitive = [("SCUBA", g, si, round(d / 3.28084, 1), t) for d, t, _, g, si in work]
+    _measure("report_single", cold.single_dive, single, results)
+    _measure("report_repetitive", cold.repetitive_dive, repetitive, results)
+    hot = single[:50]
+    _measure("report_single_cached", warm.single_dive, hot, results, repeat=max(1, n // len(hot)))
+    try:
+        import pandas as pd
+        rows = [tuple(sorted(reference_plan(d, t, a)[3].items())) for d, t, a, _, _ in work[:2000]]
+        _measure("render_stop_table", lambda stops: pd.DataFrame([{"Derinlik (ft)": k, "Süre (dk)": v} for k, v in stops]), [(r,) for r in rows], results)
+    except ImportError:
+        pass
+
+    # Mevzuat kontrolü ve toplu denetim
+    checks = [(("SCUBA", "SİDS", "NİTROKS", "KDDS")[k % 4], round(d / 3.28084, 1), d, ("21", "32", "36")[k % 3], k % 9)
+              for k, (d, *_) in enumerate(work)]
+    _measure("compliance_check", check_egm_compliance, checks, results)
+    records = [{"system": s, "depth_m": m, "depth_ft": f, "gas_o2": g, "personnel": p} for s, m, f, g, p in checks]
+    _measure(f"compliance_audit_{n}", audit, [(records,)] * (5 if quick else 20), results)
+
+    # Kayıt yazma
+    with tempfile.TemporaryDirectory() as tmp:
+        store = DiveLogStore(os.path.join(tmp, "bench.sqlite3"))
+        record = {"timestamp": datetime(2025, 3, 1, 9, 0), "diver": "bench", "dive_type": "ILK DALIS", "system": "SCUBA",
+                  "depth_ft": 60.0, "depth_m": 18.3, "bottom_time": 40, "group_letter": "H", "rnt": 0,
+                  "is_deco": False, "deco_stops": {}, "alerts": []}
+        _measure("log_write_single", store.write, [(record,)] * (200 if quick else 1000), results)
+        batch = [record] * 500
+        _measure("log_write_batch_500", store.write_many, [(batch,)] * (10 if quick else 50), results)
+        store.close()
+
+    # Toplu taramalar
+    dives = [(d, t, si, a) for d, t, a, _, si in work[:200]]
+    _measure("series_200_dives", lambda: sum(1 for _ in iter_series(dives)), [()] * (20 if quick else 100), results)
+    try:
+        import numpy as np
+        from batch_planner import plan_batch, sweep
+        d_arr = np.array([w[0] for w in work]); t_arr = np.array([w[1] for w in work]); a_arr = np.array([w[2] for w in work])
+        _measure(f"plan_batch_{n}", plan_batch, [(d_arr, t_arr, a_arr)] * (10 if quick else 50), results)
+        # Karar haritası: 190 derinlik x 1000 dakika x 10 irtifa
+        _measure("sweep_190x1000x10", sweep, [(range(1, 191), range(1000), sorted(ALTITUDE_CORRECTION))] * (2 if quick else 5), results)
+    except ImportError:
+        pass
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Temele göre verimi threshold oranından fazla düşen ölçümleri listeler. Tek
+    çağrı gecikmesi zamanlayıcı gürültüsüne açık olduğundan karar turların en
+    iyi verimine göre verilir; p50 bilgi olarak eklenir.
+    """
+    regressions = []
+    for name, base in baseline.get("results", {}).items():
+        cur = results.get(name)
+        if cur is None:
+            continue
+        if cur["ops_per_sec"] < base["ops_per_sec"] / (1 + threshold):
+            regressions.append(f"{name}: verim {base['ops_per_sec']:,.0f} -> {cur['ops_per_sec']:,.0f} işlem/sn "
+                               f"(p50 {base['p50_us']:.2f} -> {cur['p50_us']:.2f} µs)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="DiveLogic ve rapor akışları için performans ölçümü ve doğruluk kontrolü")
+    parser.add_argument("--save-baseline", metavar="DOSYA", nargs="?", const=DEFAULT_BASELINE, help="sonucu temel olarak kaydet")
+    parser.add_argument("--compare", metavar="DOSYA", nargs="?", const=DEFAULT_BASELINE, help="temele göre gerileme kontrolü yap")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="izin verilen yavaşlama oranı (varsayılan 0.25)")
+    parser.add_argument("--quick", action="store_true", help="daha küçük girdi kümesiyle çalıştır")
+    parser.add_argument("--skip-oracle", action="store_true", help="doğruluk kontrolünü atla")
+    parser.add_argument("--oracle-only", action="store_true", help="yalnızca doğruluk kontrolü")
+    args = parser.parse_args(argv)
+
+    status = 0
+    if not args.skip_oracle:
+        print("Doğruluk kontrolü...")
+        failures = check_correctness(args.quick)
+        for f in failures:
+            print("  UYUŞMAZLIK:", f)
+        print("  Tamam." if not failures else f"  {len(failures)} uyuşmazlık.")
+        status |= bool(failures)
+    if args.oracle_only:
+        return status
+
+    results = run_benchmarks(args.quick)
+    print(f"{'ölçüm':<28}{'işlem/sn':>14}{'p50 µs':>10}{'p99 µs':>10}")
+    for name, r in results.items():
+        print(f"{name:<28}{r['ops_per_sec']:>14,.0f}{r['p50_us']:>10.2f}{r['p99_us']:>10.2f}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for r in regressions:
+            print("  GERİLEME:", r)
+        status |= bool(regressions)
+
+    if args.save_baseline:
+        payload = {
+            "meta": {"created": datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+                     "platform": platform.platform(), "quick": args.quick},
+            "results": results,
+        }
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=2)
+        print(f"Temel kaydedildi: {args.save_baseline}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
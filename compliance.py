@@ -0,0 +1,172 @@
+import argparse
+import operator
+import sys
+from collections import namedtuple
+from functools import reduce
+import numpy as np
+
+# ==========================================
+# EGM MEVZUAT KONTROLLERİ
+# ==========================================
+# Kurallar sisteme göre anahtarlanmış tek bir tabloda tanımlanır. Her kural
+# (alan, işleç, değer) koşullarının VE'sidir; koşulu sağlanan kuralın mesajı
+# uyarı olarak döner. Tablo modül yüklenirken bir kez derlenir: aynı
+# karşılaştırma işleçleri hem tek dalışın skaler alanlarına hem de toplu
+# denetimde sütun dizilerine uygulanır (vektörel). Mesaj sırası tablo sırasıdır.
+#
+# Alanlar: depth_m, depth_f, o2 (gaz yüzdesi; tam sayıya çevrilemezse NaN),
+# personnel. NaN ile yapılan karşılaştırmalar yanlış döner; kaydında alan
+# eksik olan dalış o alanı kullanan kuralı ihlal etmiş sayılmaz.
+
+COMPLIANCE_RULES = {
+    "SCUBA": (
+        ("scuba_max_depth", (("depth_f", ">", 140),),
+         "❌ KRİTİK: Scuba ile maksimum derinlik sınırı 140 ft (42m) aşılamaz!"),
+        ("scuba_crew", (("personnel", "<", 3),),
+         "👥 EKİP: Scuba dalışlarında en az 3 personel bulunmalıdır."),
+    ),
+    "SİDS": (
+        ("sids_max_depth", (("depth_f", ">", 190),),
+         "❌ KRİTİK: SİDS maksimum derinlik sınırı 190 ft (58m) aşıldı!"),
+        ("sids_permit_140ft", (("depth_f", ">", 140), ("depth_f", "<=", 190)),
+         "⚠️ UYARI: 140 ft üzeri için en rütbeli kurbağa adamın yazılı izni şarttır."),
+        ("sids_crew", (("personnel", "<", 4),),
+         "👥 EKİP: 10m altı için dahi en az 4 personel gereklidir."),
+        ("sids_crew_10m", (("depth_f", ">", 33), ("personnel", "<", 7)),
+         "👥 EKİP: 10m üzeri derinlikte ekip en az 7 kişi olmalıdır."),
+    ),
+    "NİTROKS": (
+        ("nitrox32_depth", (("o2", "==", 32), ("depth_m", ">", 33)),
+         "❌ MEVZUAT: %32 Nitroks için derinlik sınırı 33 metredir."),
+        ("nitrox36_depth", (("o2", "==", 36), ("depth_m", ">", 28)),
+         "❌ MEVZUAT: %36 Nitroks için derinlik sınırı 28 metredir."),
+        ("nitrox_first_dive", (),
+         "ℹ️ İlk nitroks dalışı max 150 dk olabilir."),
+    ),
+    "KDDS": (
+        ("kdds_max_depth", (("depth_m", ">", 91),),
+         "❌ KRİTİK: KDDS maksimum derinlik sınırı 91m aşıldı!"),
+        ("kdds_permit_42m", (("depth_m", ">", 42),),
+         "⚠️ 42m üzeri için en kıdemli personelin yazılı izni gerekir."),
+        ("kdds_chamber_42m", (("depth_m", ">", 42),),
+         "🩺 KRİTİK: Sualtı hekimi ve tazyik odası bulundurulması zorunludur."),
+        ("kdds_crew", (("personnel", "<", 4),),
+         "👥 EKİP: KDDS için en az 4 personel gereklidir."),
+    ),
+}
+
+# Dalışı engelleyen uyarılar (sınır aşımı ve ekip eksikliği); diğerleri bilgilendirmedir
+BLOCKING_PREFIXES = ("❌", "👥")
+
+_OPERATORS = {">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le, "==": operator.eq}
+
+Rule = namedtuple("Rule", "id system message blocking test")
+
+
+def _compile(conditions):
+    """Koşul listesini tek bir yükleme (predicate) fonksiyonuna çevirir; skaler ve dizi alanlarda çalışır."""
+    checks = tuple((field, _OPERATORS[op], value) for field, op, value in conditions)
+    if not checks:
+        return lambda fields: True
+    if len(checks) == 1:
+        (field, op, value), = checks
+        return lambda fields: op(fields[field], value)
+    return lambda fields: reduce(operator.and_, (op(fields[f], v) for f, op, v in checks))
+
+
+_COMPILED = {
+    system: tuple(Rule(rule_id, system, message, message.startswith(BLOCKING_PREFIXES), _compile(conditions))
+                  for rule_id, conditions, message in rules)
+    for system, rules in COMPLIANCE_RULES.items()
+}
+RULES = tuple(rule for rules in _COMPILED.values() for rule in rules)
+
+
+def _o2(gas_o2):
+    try:
+        return int(gas_o2)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def check_egm_compliance(dive_system, depth_m, depth_f, gas_o2, personnel):
+    """Yönergelerdeki verilerin programa adaptasyonu"""
+    fields = {"depth_m": depth_m, "depth_f": depth_f, "o2": _o2(gas_o2), "personnel": personnel}
+    return [rule.message for rule in _COMPILED.get(dive_system, ()) if rule.test(fields)]
+
+
+def blocking_alerts(alerts):
+    """Dalışın yapılmasını engelleyen uyarıları döner."""
+    return [a for a in alerts if a.startswith(BLOCKING_PREFIXES)]
+
+
+# --- TOPLU DENETİM ---
+def _number(value):
+    return np.nan if value is None else float(value)
+
+
+def audit(records):
+    """
+    Kayıtların tamamını tek geçişte denetler. records: DiveLogStore.query()
+    çıktısı gibi 'system', 'depth_ft', 'depth_m', 'gas_o2', 'personnel'
+    alanları olan sözlükler. Derinliklerden biri eksikse diğerinden türetilir.
+
+    Dönen sözlük:
+      records  denetlenen kayıt sayısı
+      by_rule  {kural_id: ihlal sayısı} (tablo sırasıyla, sıfırlar dahil)
+      flagged  engelleyici kurallardan en az birini ihlal eden kayıt sayısı
+    """
+    systems, depth_f, depth_m, o2, personnel = [], [], [], [], []
+    for rec in records:
+        systems.append(rec.get("system"))
+        depth_f.append(_number(rec.get("depth_ft")))
+        depth_m.append(_number(rec.get("depth_m")))
+        o2.append(_o2(rec.get("gas_o2")))
+        personnel.append(_number(rec.get("personnel")))
+
+    systems = np.array(systems, dtype=object)
+    depth_f = np.array(depth_f, dtype=float)
+    depth_m = np.array(depth_m, dtype=float)
+    depth_f = np.where(np.isnan(depth_f), depth_m * 3.28084, depth_f)
+    depth_m = np.where(np.isnan(depth_m), depth_f / 3.28084, depth_m)
+    fields = {"depth_f": depth_f, "depth_m": depth_m, "o2": np.array(o2, dtype=float),
+              "personnel": np.array(personnel, dtype=float)}
+
+    by_rule = {}
+    flagged = np.zeros(len(systems), dtype=bool)
+    for system, rules in _COMPILED.items():
+        in_system = systems == system
+        for rule in rules:
+            hits = in_system & rule.test(fields)
+            by_rule[rule.id] = int(np.count_nonzero(hits))
+            if rule.blocking:
+                flagged |= hits
+    return {"records": len(systems), "by_rule": by_rule, "flagged": int(np.count_nonzero(flagged))}
+
+
+def audit_log(store, **filters):
+    """Kayıt deposundaki dalışları (DiveLogStore.query filtreleriyle) toplu denetler."""
+    return audit(store.query(**filters))
+
+
+def main(argv=None):
+    from dive_log_store import DEFAULT_LOG_DB, DiveLogStore
+    parser = argparse.ArgumentParser(description="Dalış kayıtlarının EGM mevzuatına göre toplu denetimi")
+    parser.add_argument("db", nargs="?", default=DEFAULT_LOG_DB, help="kayıt veritabanı (varsayılan dive_logs.sqlite3)")
+    parser.add_argument("--start", help="başlangıç tarihi (YYYY-MM-DD)")
+    parser.add_argument("--end", help="bitiş tarihi (YYYY-MM-DD)")
+    parser.add_argument("--system", help="yalnızca bu dalış sistemi")
+    args = parser.parse_args(argv)
+
+    with DiveLogStore(args.db) as store:
+        result = audit_log(store, start=args.start, end=args.end, system=args.system)
+
+    print(f"Denetlenen kayıt: {result['records']}  |  Engelleyici ihlalli kayıt: {result['flagged']}")
+    print(f"{'kural':<22}{'ihlal':>8}  mesaj")
+    for rule in RULES:
+        print(f"{rule.id:<22}{result['by_rule'][rule.id]:>8}  {rule.message}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
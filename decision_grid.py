@@ -0,0 +1,292 @@
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left
+from dive_logic import DiveLogic
+from data_storage import USN_REV7_DATA, AIR_DECO_DATA, ALTITUDE_CORRECTION
+
+# ==========================================
+# ÖNCEDEN HESAPLANMIŞ KARAR IZGARASI
+# ==========================================
+# Derinlik (0-190 ft, tam sayı) x dip zamanı (0-GRID_MAX_TIME dk, tam sayı) x
+# irtifa basamağı için NDL, grup harfi, deko durakları ve final grup önceden
+# hesaplanıp sürümlü bir ikili dosyaya yazılır. Dosya mmap ile açılır; her sorgu
+# tek bir ofset okumasıdır. Izgara dışındaki sorgular DiveLogic'e düşer.
+#
+# Dosya düzeni (ana makinenin bayt sırasından bağımsız olarak little-endian):
+#   başlık     : magic, sürüm, boyutlar, kaynak tablo sağlaması (sha256)
+#   irtifa     : uint32[n_alt]            (0 = deniz seviyesi, sonra Tablo 9-4 basamakları)
+#   duraklar   : uint16[n_stop]           (durak derinlikleri, ft)
+#   ndl        : uint16[n_alt][n_depth]
+#   deko süresi: uint16[n_alt][n_depth][n_time][n_stop]
+#   grup       : uint8 [n_alt][n_depth][n_time]   (Tablo 9-7 harfi, ASCII)
+#   final grup : uint8 [n_alt][n_depth][n_time]   (dalış sonu grubu, ASCII)
+
+GRID_MAGIC = b"DLGRID\x00\x00"
+GRID_VERSION = 1
+GRID_MAX_DEPTH = 190
+GRID_MAX_TIME = 1440
+DEFAULT_GRID_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "decision_grid.bin")
+
+_HEADER = struct.Struct("<8sHHHHH32s")
+
+_ALT_STEPS = (0,) + tuple(sorted(ALTITUDE_CORRECTION.keys()))
+_STOP_DEPTHS = tuple(sorted({s for rows in AIR_DECO_DATA.values() for row in rows.values() for s in row["stops"]}, reverse=True))
+_NO_STOP = {s: 0 for s in _STOP_DEPTHS}
+
+
+def _le_bytes(values):
+    """array'i little-endian bayt dizisine çevirir (big-endian makinede bayt sırası çevrilir)."""
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _le_view(section, typecode):
+    """Little-endian bölümü yerel sıralı tipli görünüm olarak döner; big-endian makinede kopyalanır."""
+    if sys.byteorder == "little":
+        return section.cast(typecode)
+    values = array(typecode, section.tobytes())
+    values.byteswap()
+    return memoryview(values)
+
+
+class StaleGridError(Exception):
+    """Izgara dosyası bozuk, farklı sürümde ya da kaynak tablolarla uyuşmuyor."""
+
+
+def source_checksum():
+    """Izgarayı üreten tabloların ve düzenin sha256 özetini döner."""
+    h = hashlib.sha256()
+    h.update(repr((GRID_VERSION, GRID_MAX_DEPTH, GRID_MAX_TIME, _ALT_STEPS, _STOP_DEPTHS)).encode())
+    for table in (USN_REV7_DATA, AIR_DECO_DATA, ALTITUDE_CORRECTION):
+        h.update(repr(table).encode())
+    return h.digest()
+
+
+def _altitude_index(altitude_feet):
+    """İrtifayı ızgaradaki basamak indeksine çevirir (DiveLogic ile aynı yuvarlama)."""
+    if altitude_feet <= 0:
+        return 0
+    return min(bisect_left(_ALT_STEPS, altitude_feet, 1), len(_ALT_STEPS) - 1)
+
+
+def build_grid(path=DEFAULT_GRID_PATH):
+    """Tüm karar uzayını DiveLogic ile hesaplar ve dosyaya yazar."""
+    n_depth, n_time = GRID_MAX_DEPTH + 1, GRID_MAX_TIME + 1
+    ndl_section = array("H")
+    stop_section = bytearray()  # little-endian uint16 satırları
+    group_section = bytearray()
+    final_section = bytearray()
+
+    usn_depths = sorted(USN_REV7_DATA.keys())
+    deco_depths = sorted(AIR_DECO_DATA.keys())
+    row_cache = {}
+
+    for alt in _ALT_STEPS:
+        for depth in range(n_depth):
+            equiv = DiveLogic.get_altitude_correction(depth, alt)
+            ndl = DiveLogic.get_ndl(equiv)
+            ndl_section.append(min(ndl, 0xFFFF))
+
+            # Aynı tablo satırlarına düşen derinlikler aynı zaman satırını paylaşır
+            key = (ndl, bisect_left(usn_depths, equiv), bisect_left(deco_depths, equiv))
+            if key not in row_cache:
+                groups, finals, stops = bytearray(), bytearray(), array("H")
+                for t in range(n_time):
+                    group = DiveLogic.get_group_letter(equiv, t)
+                    cell_stops = _NO_STOP
+                    if t > ndl:
+                        deco = DiveLogic.get_deco_details(equiv, t)
+                        if deco and "stops" in deco:
+                            final = deco["final_group"]
+                            cell_stops = deco["stops"]
+                        else: final = "Z"
+                    else:
+                        final = group
+                    groups.append(ord(group))
+                    finals.append(ord(final))
+                    stops.extend(cell_stops.get(s, 0) for s in _STOP_DEPTHS)
+                row_cache[key] = (bytes(groups), bytes(finals), _le_bytes(stops))
+            groups, finals, stops = row_cache[key]
+            group_section += groups
+            final_section += finals
+            stop_section += stops
+
+    header = _HEADER.pack(GRID_MAGIC, GRID_VERSION, GRID_MAX_DEPTH, GRID_MAX_TIME,
+                          len(_ALT_STEPS), len(_STOP_DEPTHS), source_checksum())
+    # Aynı anda yeniden üreten süreçler birbirinin geçici dosyasını ezmesin diye benzersiz ad
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+                                    prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            f.write(_le_bytes(array("I", _ALT_STEPS)))
+            f.write(_le_bytes(array("H", _STOP_DEPTHS)))
+            f.write(_le_bytes(ndl_section))
+            f.write(stop_section)
+            f.write(group_section)
+            f.write(final_section)
+        os.chmod(tmp_path, 0o644)  # mkstemp yalnızca sahibine izin verir
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return path
+
+
+class DecisionGrid:
+    """
+    mmap ile açılmış karar ızgarası. Izgara içindeki sorgular yalnızca ofset
+    okuması yapar ve nesne üretmez; dışındakiler DiveLogic ile hesaplanır.
+    """
+
+    def __init__(self, path=DEFAULT_GRID_PATH):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise StaleGridError("Izgara dosyası boş.")
+        try:
+            self._map_sections()
+        except Exception:
+            self.close()
+            raise
+
+    def _map_sections(self):
+        if len(self._mm) < _HEADER.size:
+            raise StaleGridError("Izgara başlığı eksik.")
+        magic, version, max_depth, max_time, n_alt, n_stop, checksum = _HEADER.unpack_from(self._mm, 0)
+        if magic != GRID_MAGIC or version != GRID_VERSION:
+            raise StaleGridError("Izgara dosyası biçimi/sürümü uyumsuz.")
+        if checksum != source_checksum():
+            raise StaleGridError("Izgara kaynak tablolarla uyuşmuyor.")
+
+        n_depth, n_time = max_depth + 1, max_time + 1
+        sizes = [
+            ("alt", 4 * n_alt), ("stop_depths", 2 * n_stop), ("ndl", 2 * n_alt * n_depth),
+            ("stops", 2 * n_alt * n_depth * n_time * n_stop),
+            ("group", n_alt * n_depth * n_time), ("final", n_alt * n_depth * n_time),
+        ]
+        if len(self._mm) != _HEADER.size + sum(size for _, size in sizes):
+            raise StaleGridError("Izgara dosyası boyutu hatalı.")
+
+        view = memoryview(self._mm)
+        offset = _HEADER.size
+        sections = {}
+        for name, size in sizes:
+            sections[name] = view[offset:offset + size]
+            offset += size
+
+        self.max_depth, self.max_time = max_depth, max_time
+        with _le_view(sections["stop_depths"], "H") as stop_view:
+            self.stop_depths = tuple(stop_view)
+        self._n_time, self._n_stop = n_time, n_stop
+        self._depth_stride = n_time
+        self._alt_stride = n_depth * n_time
+        self._ndl = _le_view(sections["ndl"], "H")
+        self._stops = _le_view(sections["stops"], "H")
+        self._group = sections["group"]
+        self._final = sections["final"]
+        self._views = [view] + list(sections.values())
+
+    def close(self):
+        # Türetilmiş görünümler, bağlı oldukları görünümden önce bırakılmalıdır
+        for v in [getattr(self, "_ndl", None), getattr(self, "_stops", None)] + getattr(self, "_views", [])[::-1]:
+            if v is not None:
+                v.release()
+        self._views = []
+        self._ndl = self._stops = None
+        if getattr(self, "_mm", None) is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _cell(self, depth_feet, bottom_time, altitude_feet):
+        """Izgara hücresinin ofsetini döner; ızgara dışındaysa -1."""
+        if (depth_feet.__class__ is not int and not float(depth_feet).is_integer()) or \
+           (bottom_time.__class__ is not int and not float(bottom_time).is_integer()):
+            return -1
+        if not (0 <= depth_feet <= self.max_depth and 0 <= bottom_time <= self.max_time):
+            return -1
+        return _altitude_index(altitude_feet) * self._alt_stride + int(depth_feet) * self._depth_stride + int(bottom_time)
+
+    def get_ndl(self, depth_feet, altitude_feet=0):
+        """Gerçek derinlik ve irtifa için NDL."""
+        if depth_feet.__class__ is int and 0 <= depth_feet <= self.max_depth:
+            return self._ndl[_altitude_index(altitude_feet) * (self.max_depth + 1) + depth_feet]
+        return DiveLogic.get_ndl(DiveLogic.get_altitude_correction(depth_feet, altitude_feet))
+
+    def get_group_letter(self, depth_feet, bottom_time, altitude_feet=0):
+        """Tablo 9-7 grup harfi."""
+        cell = self._cell(depth_feet, bottom_time, altitude_feet)
+        if cell < 0:
+            return DiveLogic.get_group_letter(DiveLogic.get_altitude_correction(depth_feet, altitude_feet), bottom_time)
+        return chr(self._group[cell])
+
+    def get_final_group(self, depth_feet, bottom_time, altitude_feet=0):
+        """Dalış sonu grubu (deko dalışında Tablo 9-9 final grubu, satır yoksa 'Z')."""
+        cell = self._cell(depth_feet, bottom_time, altitude_feet)
+        if cell < 0:
+            return self._compute(depth_feet, bottom_time, altitude_feet)[2]
+        return chr(self._final[cell])
+
+    def get_stop_time(self, depth_feet, bottom_time, altitude_feet=0, stop_index=0):
+        """stop_depths[stop_index] durağındaki deko süresi (dk)."""
+        cell = self._cell(depth_feet, bottom_time, altitude_feet)
+        if cell < 0:
+            return self._compute(depth_feet, bottom_time, altitude_feet)[3].get(self.stop_depths[stop_index], 0)
+        return self._stops[cell * self._n_stop + stop_index]
+
+    def plan(self, depth_feet, bottom_time, altitude_feet=0):
+        """(NDL, Tablo 9-7 grubu, final grup, {durak: süre}) döner."""
+        cell = self._cell(depth_feet, bottom_time, altitude_feet)
+        if cell < 0:
+            return self._compute(depth_feet, bottom_time, altitude_feet)
+        base = cell * self._n_stop
+        stops = {s: self._stops[base + k] for k, s in enumerate(self.stop_depths)}
+        return self.get_ndl(int(depth_feet), altitude_feet), chr(self._group[cell]), chr(self._final[cell]), stops
+
+    @staticmethod
+    def _compute(depth_feet, bottom_time, altitude_feet):
+        """Izgara dışı sorgular için DiveLogic ile aynı hesap."""
+        equiv = DiveLogic.get_altitude_correction(depth_feet, altitude_feet)
+        ndl = DiveLogic.get_ndl(equiv)
+        group = DiveLogic.get_group_letter(equiv, bottom_time)
+        stops = dict(_NO_STOP)
+        if bottom_time > ndl:
+            deco = DiveLogic.get_deco_details(equiv, bottom_time)
+            if deco and "stops" in deco:
+                final = deco["final_group"]
+                stops.update(deco["stops"])
+            else: final = "Z"
+        else:
+            final = group
+        return ndl, group, final, stops
+
+
+def load_grid(path=DEFAULT_GRID_PATH):
+    """Izgarayı açar; dosya yoksa ya da eskimişse önce yeniden üretir."""
+    try:
+        return DecisionGrid(path)
+    except (FileNotFoundError, StaleGridError):
+        build_grid(path)
+        return DecisionGrid(path)
+
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_GRID_PATH
+    print(f"Izgara yazıldı: {build_grid(target)} ({os.path.getsize(target)} bayt)")
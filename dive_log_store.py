@@ -0,0 +1,278 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+
+# ==========================================
+# YAPILANDIRILMIŞ DALIŞ KAYIT DEPOSU
+# ==========================================
+# dive_logs.txt yerine SQLite (WAL kipinde) kullanılır. Her kayıt tipli
+# alanlardan oluşur; dalgıç, tarih, grup ve sistem üzerinde indeks vardır.
+# Yazmalar tamponlanıp tek işlemde (transaction) diske aktarılır.
+
+DEFAULT_LOG_DB = "dive_logs.sqlite3"
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+_COLUMNS = (
+    "timestamp", "diver", "dive_type", "system", "depth_ft", "depth_m", "bottom_time",
+    "altitude_ft", "gas_o2", "personnel", "group_letter", "rnt", "is_deco",
+    "deco_stops", "alerts", "report",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dives (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    diver TEXT,
+    dive_type TEXT,
+    system TEXT,
+    depth_ft REAL,
+    depth_m REAL,
+    bottom_time REAL,
+    altitude_ft REAL,
+    gas_o2 TEXT,
+    personnel INTEGER,
+    group_letter TEXT,
+    rnt INTEGER,
+    is_deco INTEGER,
+    deco_stops TEXT,
+    alerts TEXT,
+    report TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_dives_timestamp ON dives (timestamp);
+CREATE INDEX IF NOT EXISTS idx_dives_diver ON dives (diver, timestamp);
+CREATE INDEX IF NOT EXISTS idx_dives_group ON dives (group_letter, timestamp);
+CREATE INDEX IF NOT EXISTS idx_dives_system ON dives (system, timestamp);
+CREATE INDEX IF NOT EXISTS idx_dives_deco ON dives (is_deco, timestamp);
+"""
+
+
+def _ts(value):
+    """datetime/date/str değerini saklanan zaman damgası biçimine çevirir."""
+    if isinstance(value, datetime):
+        return value.strftime(TIMESTAMP_FORMAT)
+    if isinstance(value, date):
+        return value.strftime("%Y-%m-%d")
+    return str(value)
+
+
+def _end_bound(end):
+    """end için (işleç, değer) döner; yalnızca tarih olan end ertesi günün başına kadar (hariç) uzanır."""
+    if isinstance(end, str) and len(end) == 10:
+        end = date.fromisoformat(end)
+    if isinstance(end, date) and not isinstance(end, datetime):
+        return "<", _ts(end + timedelta(days=1))
+    return "<=", _ts(end)
+
+
+def _row(record):
+    """Kayıt sözlüğünü tablo satırına çevirir (duraklar ve uyarılar JSON olarak)."""
+    stops = record.get("deco_stops") or {}
+    if not isinstance(stops, dict):
+        stops = dict(stops)
+    is_deco = record.get("is_deco")
+    return (
+        _ts(record.get("timestamp") or datetime.now()),
+        record.get("diver") or None,
+        record.get("dive_type"),
+        record.get("system"),
+        record.get("depth_ft"),
+        record.get("depth_m"),
+        record.get("bottom_time"),
+        record.get("altitude_ft"),
+        None if record.get("gas_o2") is None else str(record.get("gas_o2")),
+        record.get("personnel"),
+        record.get("group_letter"),
+        record.get("rnt"),
+        None if is_deco is None else int(bool(is_deco)),
+        json.dumps({str(k): v for k, v in stops.items()}, ensure_ascii=False),
+        json.dumps(list(record.get("alerts") or ()), ensure_ascii=False),
+        record.get("report"),
+    )
+
+
+def _record(row):
+    """Tablo satırını kayıt sözlüğüne çevirir."""
+    rec = dict(zip(("id",) + _COLUMNS, row))
+    rec["deco_stops"] = {int(k): v for k, v in json.loads(rec["deco_stops"] or "{}").items()}
+    rec["alerts"] = json.loads(rec["alerts"] or "[]")
+    if rec["is_deco"] is not None:
+        rec["is_deco"] = bool(rec["is_deco"])
+    return rec
+
+
+class DiveLogStore:
+    def __init__(self, path=DEFAULT_LOG_DB, batch_size=100):
+        self.path = path
+        self.batch_size = batch_size
+        self._pending = []
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add(self, record):
+        """Kaydı tampona ekler; tampon batch_size'a ulaşınca diske yazılır."""
+        with self._lock:
+            self._pending.append(_row(record))
+            if len(self._pending) >= self.batch_size:
+                self._flush_locked()
+
+    def write(self, record):
+        """Kaydı hemen diske yazar."""
+        self.write_many([record])
+
+    def write_many(self, records):
+        """Kayıtları (bekleyenlerle birlikte) tek işlemde yazar."""
+        with self._lock:
+            self._pending.extend(_row(r) for r in records)
+            self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._pending:
+            return
+        with self._conn:
+            self._conn.executemany(
+                f"INSERT INTO dives ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+                self._pending,
+            )
+        self._pending = []
+
+    def close(self):
+        with self._lock:
+            self._flush_locked()
+            self._conn.close()
+
+    def query(self, diver=None, start=None, end=None, group=None, system=None,
+              is_deco=None, dive_type=None, limit=None):
+        """
+        Filtrelere uyan kayıtları zaman sırasıyla üretir (generator).
+        start/end datetime, date ya da 'YYYY-MM-DD[ HH:MM:SS]' olabilir; yalnızca
+        tarih verilen end (date ya da 'YYYY-MM-DD') o günün tamamını kapsar.
+        """
+        clauses, params = [], []
+        if diver is not None:
+            clauses.append("diver = ?"); params.append(diver)
+        if start is not None:
+            clauses.append("timestamp >= ?"); params.append(_ts(start))
+        if end is not None:
+            op, bound = _end_bound(end)
+            clauses.append(f"timestamp {op} ?"); params.append(bound)
+        if group is not None:
+            clauses.append("group_letter = ?"); params.append(group)
+        if system is not None:
+            clauses.append("system = ?"); params.append(system)
+        if is_deco is not None:
+            clauses.append("is_deco = ?"); params.append(int(bool(is_deco)))
+        if dive_type is not None:
+            clauses.append("dive_type = ?"); params.append(dive_type)
+
+        sql = f"SELECT id, {', '.join(_COLUMNS)} FROM dives"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY timestamp, id"
+        if limit is not None:
+            sql += " LIMIT ?"; params.append(int(limit))
+
+        # Okumalar ayrı bağlantıdan yapılır; WAL kipinde yazmaları engellemez
+        self.flush()
+        conn = sqlite3.connect(self.path)
+        try:
+            cursor = conn.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(500)
+                if not rows:
+                    break
+                for row in rows:
+                    yield _record(row)
+        finally:
+            conn.close()
+
+    def count(self):
+        with self._lock:
+            self._flush_locked()
+            return self._conn.execute("SELECT COUNT(*) FROM dives").fetchone()[0]
+
+
+# --- ESKİ METİN KAYITLARININ AKTARIMI ---
+_BLOCK_RE = re.compile(r"KAYIT TARIHI: (?P<ts>[\d\- :]+)\r?\nDALIS TIPI: (?P<type>[^\r\n]*)\r?\n(?P<body>.*?)\r?\n#{50}", re.S)
+_FIELD_RES = {
+    "system": (re.compile(r"Seçilen Sistem: (\S+)"), str),
+    "depth_ft": (re.compile(r"Derinlik: ([\d.]+) ft"), float),
+    "depth_m": (re.compile(r"Derinlik: [\d.]+ ft \(([\d.]+) m\)"), float),
+    "group_letter": (re.compile(r"Dalış Sonu Grup: (\w)"), str),
+    "rnt": (re.compile(r"\(RNT\): (\d+)"), int),
+    "bottom_time": (re.compile(r"Planlanan Dip Zamanı: ([\d.]+)"), float),
+}
+
+
+_SEPARATOR = "#" * 50
+
+
+def _iter_blocks(f):
+    """Dosyayı satır satır okuyup ayraçla biten kayıt bloklarını üretir; tüm dosya belleğe alınmaz."""
+    lines = []
+    for line in f:
+        lines.append(line)
+        if line.startswith(_SEPARATOR):
+            yield "".join(lines)
+            lines = []
+
+
+def _parse_block(m):
+    body = m.group("body")
+    rec = {"timestamp": m.group("ts").strip(), "dive_type": m.group("type").strip(), "report": body.strip()}
+    for field, (pattern, cast) in _FIELD_RES.items():
+        found = pattern.search(body)
+        if found:
+            rec[field] = cast(found.group(1))
+    rec["is_deco"] = "DEKOMPRESYONLU" in body
+    rec["deco_stops"] = {int(d): int(t) for d, t in re.findall(r"-> (\d+) ft Durağı: (\d+) dk", body)}
+    rec["alerts"] = [line for line in body.splitlines() if line[:1] in ("❌", "⚠", "👥", "🩺", "ℹ")]
+    return rec
+
+
+def import_text_log(store, path="dive_logs.txt", chunk_size=500):
+    """
+    Eski dive_logs.txt bloklarını ayrıştırıp depoya aktarır. Dosya blok blok
+    okunur, kayıtlar chunk_size'lık gruplar halinde yazılır. Aktarılan kayıt sayısını döner.
+    """
+    if not os.path.exists(path):
+        return 0
+    total = 0
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for block in _iter_blocks(f):
+            m = _BLOCK_RE.search(block)
+            if not m:
+                continue
+            records.append(_parse_block(m))
+            if len(records) >= chunk_size:
+                store.write_many(records)
+                total += len(records)
+                records = []
+    if records:
+        store.write_many(records)
+        total += len(records)
+    return total
+
+
+def open_store(path=DEFAULT_LOG_DB, legacy_path="dive_logs.txt"):
+    """Depoyu açar; depo boşsa ve eski metin kaydı varsa bir kez içeri aktarır."""
+    store = DiveLogStore(path)
+    if store.count() == 0:
+        import_text_log(store, legacy_path)
+    return store
@@ -1,9 +1,74 @@
 import math
+from bisect import bisect_left, bisect_right
 from data_storage import (
     USN_REV7_DATA, SURFACE_INTERVAL_DATA, RNT_DATA, 
     AIR_DECO_DATA, ALTITUDE_CORRECTION, SAFETY_RULES
 )
 
+# ==========================================
+# DERLENMİŞ TABLO KATMANI
+# ==========================================
+# Modül yüklenirken bir kez kurulur. Sıralı derinlik/zaman/irtifa kırılım
+# noktaları tuple dizileri olarak tutulur; her sorgu bir bisect ya da
+# doğrudan indeks erişimine iner. Sözlükler her çağrıda yeniden sıralanmaz.
+
+def _to_minutes(hhmm):
+    """'S:DD' biçimindeki süreyi tam sayı dakikaya çevirir."""
+    h, m = map(int, hhmm.split(':'))
+    return h * 60 + m
+
+# Tablo 9-4: İrtifa basamakları ve düzeltme katsayıları
+_ALT_STEPS = tuple(sorted(ALTITUDE_CORRECTION.keys()))
+_ALT_FACTORS = tuple(ALTITUDE_CORRECTION[a] for a in _ALT_STEPS)
+
+# Tablo 9-7: Derinlik satırları, NDL değerleri ve grup aralıkları
+_NDL_DEPTHS = tuple(sorted(USN_REV7_DATA.keys()))
+_NDL_VALUES = tuple(USN_REV7_DATA[d]["ndl"] for d in _NDL_DEPTHS)
+_GROUP_STARTS, _GROUP_ENDS, _GROUP_LETTERS = [], [], []
+for _d in _NDL_DEPTHS:
+    _rows = sorted(USN_REV7_DATA[_d]["groups"])
+    _GROUP_STARTS.append(tuple(r[0] for r in _rows))
+    _GROUP_ENDS.append(tuple(r[1] for r in _rows))
+    _GROUP_LETTERS.append(tuple(r[2] for r in _rows))
+_GROUP_STARTS, _GROUP_ENDS, _GROUP_LETTERS = tuple(_GROUP_STARTS), tuple(_GROUP_ENDS), tuple(_GROUP_LETTERS)
+
+# Tablo 9-9: Dekompresyon derinlikleri, dip zamanları ve satır kayıtları
+_DECO_DEPTHS = tuple(sorted(AIR_DECO_DATA.keys()))
+_DECO_TIMES = tuple(tuple(sorted(AIR_DECO_DATA[d].keys())) for d in _DECO_DEPTHS)
+_DECO_ROWS = tuple(
+    tuple(AIR_DECO_DATA[d][t] for t in times) for d, times in zip(_DECO_DEPTHS, _DECO_TIMES)
+)
+
+# Tablo 9-8 (Üst): "S:DD" sınırları önceden dakikaya çevrilmiş satıh fasılası aralıkları
+_SI_STARTS, _SI_ENDS, _SI_LETTERS = {}, {}, {}
+for _g, _rows in SURFACE_INTERVAL_DATA.items():
+    _rows = sorted((_to_minutes(s), _to_minutes(e), letter) for s, e, letter in _rows)
+    _SI_STARTS[_g] = tuple(r[0] for r in _rows)
+    _SI_ENDS[_g] = tuple(r[1] for r in _rows)
+    _SI_LETTERS[_g] = tuple(r[2] for r in _rows)
+
+# Tablo 9-8 (Alt): Grup bazında RNT derinlikleri ve değerleri
+_RNT_DEPTHS = {g: tuple(sorted(row.keys())) for g, row in RNT_DATA.items()}
+_RNT_VALUES = {g: tuple(RNT_DATA[g][d] for d in _RNT_DEPTHS[g]) for g in RNT_DATA}
+
+# Ters sorgu indeksleri: grup harfleri artan azot yüküne göre sıralanır.
+# Her RNT derinliği için sütun (harf sırasına göre RNT) ve her eski grup için
+# satıh fasılası satırlarının negatif harf sırası tutulur; ikisi de artan
+# dizilerdir, bu yüzden ters sorgular da bisect ile çözülür.
+_LETTER_ORDER = tuple(RNT_DATA.keys())
+_LETTER_RANK = {g: i for i, g in enumerate(_LETTER_ORDER)}
+_INV_RNT_DEPTHS = tuple(sorted({d for row in RNT_DATA.values() for d in row}))
+_INV_RNT_COLUMNS = tuple(
+    tuple(RNT_DATA[g].get(d, 0) for g in _LETTER_ORDER) for d in _INV_RNT_DEPTHS
+)
+_INV_SI_NEG_RANKS = {
+    g: tuple(-_LETTER_RANK.get(letter, len(_LETTER_ORDER)) for letter in letters)
+    for g, letters in _SI_LETTERS.items()
+}
+
+del _d, _g, _rows
+
+
 class DiveLogic:
     @staticmethod
     def get_altitude_correction(depth_feet, altitude_feet):
@@ -15,23 +80,20 @@ class DiveLogic:
             return depth_feet
         
         # Mevcut irtifadan büyük veya eşit olan en yakın irtifa basamağını bulur
-        sorted_altitudes = sorted(ALTITUDE_CORRECTION.keys())
-        target_alt = next((alt for alt in sorted_altitudes if altitude_feet <= alt), sorted_altitudes[-1])
-        
-        factor = ALTITUDE_CORRECTION.get(target_alt, 1.0)
-        return depth_feet * factor
+        i = bisect_left(_ALT_STEPS, altitude_feet)
+        if i == len(_ALT_STEPS):
+            i -= 1
+        return depth_feet * _ALT_FACTORS[i]
 
     @staticmethod
     def get_ndl(depth_feet):
         """
         Tablo 9-7'ye göre verilen derinlik için Sıfır Dekompresyon Limitini (NDL) döner.
         """
-        depth_list = sorted(USN_REV7_DATA.keys())
         # Derinliği bir üst standart değere yuvarlar (Örn: 42 ft -> 45 ft tablosu)
-        target_depth = next((d for d in depth_list if d >= depth_feet), None)
-        
-        if target_depth:
-            return USN_REV7_DATA[target_depth]["ndl"]
+        i = bisect_left(_NDL_DEPTHS, depth_feet)
+        if i < len(_NDL_DEPTHS):
+            return _NDL_VALUES[i]
         return 0
 
     @staticmethod
@@ -40,16 +102,13 @@ class DiveLogic:
         Tablo 9-9 (Hava Dekompresyon Tablosu) verilerini sorgular.
         Eğer dalış NDL'i aşmışsa gereken durakları ve final grup harfini döner.
         """
-        depth_list = sorted(AIR_DECO_DATA.keys())
-        target_depth = next((d for d in depth_list if d >= depth_feet), None)
-        
-        if target_depth and target_depth in AIR_DECO_DATA:
-            times = sorted(AIR_DECO_DATA[target_depth].keys())
+        i = bisect_left(_DECO_DEPTHS, depth_feet)
+        if i < len(_DECO_DEPTHS):
+            times = _DECO_TIMES[i]
             # Dip zamanını bir üst tablo değerine yuvarlar
-            target_time = next((t for t in times if t >= bottom_time), None)
-            
-            if target_time:
-                return AIR_DECO_DATA[target_depth][target_time]
+            j = bisect_left(times, bottom_time)
+            if j < len(times):
+                return _DECO_ROWS[i][j]
         return None
 
     @staticmethod
@@ -57,13 +116,12 @@ class DiveLogic:
         """
         Tablo 9-7'ye göre dekompresyonsuz dalış sonrası grup harfini belirler.
         """
-        depth_list = sorted(USN_REV7_DATA.keys())
-        target_depth = next((d for d in depth_list if d >= depth_feet), None)
-        
-        if target_depth:
-            for start, end, letter in USN_REV7_DATA[target_depth]["groups"]:
-                if start <= bottom_time <= end:
-                    return letter
+        i = bisect_left(_NDL_DEPTHS, depth_feet)
+        if i < len(_NDL_DEPTHS):
+            # Başlangıcı dip zamanını geçmeyen son aralık
+            j = bisect_right(_GROUP_STARTS[i], bottom_time) - 1
+            if j >= 0 and bottom_time <= _GROUP_ENDS[i][j]:
+                return _GROUP_LETTERS[i][j]
         return 'Z' # Tablo dışı veya aşırı limit durumunda en riskli grup
 
     @staticmethod
@@ -71,29 +129,88 @@ class DiveLogic:
         """
         Tablo 9-8 (Üst) Satıh fasılası sonrası yeni grup harfini hesaplar.
         """
-        if old_group not in SURFACE_INTERVAL_DATA:
+        starts = _SI_STARTS.get(old_group)
+        if starts is None:
             return old_group
             
-        for start_str, end_str, new_letter in SURFACE_INTERVAL_DATA[old_group]:
-            h1, m1 = map(int, start_str.split(':'))
-            h2, m2 = map(int, end_str.split(':'))
-            # Zaman aralığını dakika cinsinden kontrol eder
-            if (h1 * 60 + m1) <= interval_minutes <= (h2 * 60 + m2):
-                return new_letter
+        # Tablonun ilk aralığından (10 dk) kısa fasılada azot atımı sayılmaz; grup korunur
+        if interval_minutes < starts[0]:
+            return old_group
+
+        # Zaman aralığını dakika cinsinden kontrol eder
+        j = bisect_right(starts, interval_minutes) - 1
+        if j >= 0 and interval_minutes <= _SI_ENDS[old_group][j]:
+            return _SI_LETTERS[old_group][j]
         return 'A' # Fasıla çok uzunsa vücut tamamen temizlenmiş kabul edilir
 
+    @staticmethod
+    def is_repetitive(old_group, interval_minutes):
+        """
+        Tablo 9-8 (Üst) sınırları içinde kalan satıh fasılasından sonraki dalış
+        mükerrer dalış sayılır; fasıla tablonun son aralığını aşıyorsa değildir.
+        """
+        ends = _SI_ENDS.get(old_group)
+        if ends is None:
+            return False
+        return interval_minutes <= ends[-1]
+
     @staticmethod
     def calculate_rnt(depth_feet, group_letter):
         """
         Tablo 9-8 (Alt) Rezidüel Nitrojen Zamanını (RNT) bulur.
         """
-        if group_letter in RNT_DATA:
-            depth_list = sorted(RNT_DATA[group_letter].keys())
-            target_depth = next((d for d in depth_list if d >= depth_feet), None)
-            if target_depth:
-                return RNT_DATA[group_letter][target_depth]
+        depths = _RNT_DEPTHS.get(group_letter)
+        if depths is not None:
+            i = bisect_left(depths, depth_feet)
+            if i < len(depths):
+                return _RNT_VALUES[group_letter][i]
         return 0
 
+    @staticmethod
+    def get_max_bottom_time(depth_feet, old_group=None, interval_minutes=None):
+        """
+        Verilen derinlikte NDL içinde kalınabilecek en uzun dip zamanını döner.
+        Önceki grup (ve satıh fasılası) verilirse RNT düşülür: RNT + dip zamanı <= NDL.
+        Fasıla Tablo 9-8 sınırını aşmışsa dalış mükerrer değildir; NDL'in tamamı kullanılır.
+        """
+        ndl = DiveLogic.get_ndl(depth_feet)
+        if old_group is None:
+            return ndl
+        if interval_minutes is not None and not DiveLogic.is_repetitive(old_group, interval_minutes):
+            return ndl
+        group = old_group if interval_minutes is None else DiveLogic.get_new_group_after_si(old_group, interval_minutes)
+        return max(0, ndl - DiveLogic.calculate_rnt(depth_feet, group))
+
+    @staticmethod
+    def get_min_surface_interval(old_group, depth_feet, planned_time):
+        """
+        Planlanan mükerrer dalışın NDL içinde kalması için gereken en kısa satıh
+        fasılasını (dakika) döner. Tablo 9-8 içinde hiçbir grup yetmiyorsa dalışın
+        mükerrer sayılmadığı ilk fasıla (son aralık sonu + 1) döner; planlanan süre
+        NDL'i tek başına aşıyorsa None.
+        """
+        allowed_rnt = DiveLogic.get_ndl(depth_feet) - planned_time
+        if allowed_rnt < 0:
+            return None
+
+        starts = _SI_STARTS.get(old_group)
+        if starts is None:
+            # Tabloda olmayan grup fasıladan etkilenmez
+            if DiveLogic.calculate_rnt(depth_feet, old_group) <= allowed_rnt:
+                return SAFETY_RULES["MIN_SURFACE_INTERVAL"]
+            return None
+
+        i = bisect_left(_INV_RNT_DEPTHS, depth_feet)
+        if i == len(_INV_RNT_DEPTHS):
+            return starts[0]  # Tablo dışı derinlikte RNT sıfırdır
+        # RNT'si izin verilen değeri aşmayan en yüksek harf sırası
+        max_rank = bisect_right(_INV_RNT_COLUMNS[i], allowed_rnt) - 1
+        # Yeni grubu bu sıraya inen ilk fasıla satırı
+        j = bisect_left(_INV_SI_NEG_RANKS[old_group], -max_rank) if max_rank >= 0 else len(starts)
+        if j == len(starts):
+            return _SI_ENDS[old_group][-1] + 1
+        return starts[j]
+
     @staticmethod
     def get_no_fly_time(is_deco_dive):
         """
@@ -101,4 +218,13 @@ class DiveLogic:
         """
         if is_deco_dive:
             return SAFETY_RULES["FLYING_AFTER_DIVING"]["DECO"]
-        return SAFETY_RULES["FLYING_AFTER_DIVING"]["NO_DECO"]
\ No newline at end of file
+        return SAFETY_RULES["FLYING_AFTER_DIVING"]["NO_DECO"]
+
+    @staticmethod
+    def open_grid(path=None):
+        """
+        Önceden hesaplanmış karar ızgarasını (decision_grid.py) mmap ile açar.
+        Dosya yoksa ya da kaynak tablolarla uyuşmuyorsa önce yeniden üretir.
+        """
+        from decision_grid import load_grid, DEFAULT_GRID_PATH
+        return load_grid(path or DEFAULT_GRID_PATH)
@@ -0,0 +1,165 @@
+from dive_logic import DiveLogic
+from data_storage import SAFETY_RULES
+
+# ==========================================
+# ÇOK GÜNLÜ MÜKERRER DALIŞ ZİNCİRİ
+# ==========================================
+# Bir dalgıcın dalışlarını sırayla işler. Her adımda yalnızca bir önceki
+# dalışın durumu (grup, saat, uçuş yasağı) taşınır; böylece yüzlerce dalışlık
+# bir kampanya tek geçişte ve sabit bellekle değerlendirilir.
+
+
+def _unpack(dive):
+    """
+    Dalışı sözlük ya da (derinlik, dip zamanı, SI, irtifa) dizisi olarak kabul eder.
+    SI verilmemişse None döner; ilk dalış dışında SI zorunludur (bkz. _step).
+    """
+    if isinstance(dive, dict):
+        return (dive["depth_ft"], dive["bottom_time"],
+                dive.get("surface_interval"), dive.get("altitude_ft", 0))
+    depth_ft, bottom_time, *rest = dive
+    surface_interval = rest[0] if len(rest) > 0 else None
+    altitude_ft = rest[1] if len(rest) > 1 else 0
+    return depth_ft, bottom_time, surface_interval, altitude_ft
+
+
+def evaluate_dive(depth_feet, bottom_time, altitude_feet=0, prev_group=None, interval_minutes=None):
+    """
+    Tek bir dalışı (gerekirse mükerrer olarak) app.py'deki akışla değerlendirir.
+    Önceki grup yoksa ya da satıh fasılası Tablo 9-8 sınırını aşmışsa RNT sıfırdır;
+    10 dakikadan kısa fasılada önceki grup aynen korunur.
+    """
+    equiv_depth = DiveLogic.get_altitude_correction(depth_feet, altitude_feet)
+
+    repetitive = prev_group is not None and DiveLogic.is_repetitive(prev_group, interval_minutes)
+    if repetitive:
+        si_group = DiveLogic.get_new_group_after_si(prev_group, interval_minutes)
+        rnt = DiveLogic.calculate_rnt(equiv_depth, si_group)
+    else:
+        si_group, rnt = None, 0
+    total_time = rnt + bottom_time
+
+    ndl = DiveLogic.get_ndl(equiv_depth)
+    is_deco = total_time > ndl
+    stops = {}
+    if is_deco:
+        deco = DiveLogic.get_deco_details(equiv_depth, total_time)
+        if deco and "stops" in deco:
+            stops = {k: v for k, v in deco["stops"].items() if v > 0}
+            group = deco["final_group"]
+        else: group = "Z"
+    else:
+        group = DiveLogic.get_group_letter(equiv_depth, total_time)
+
+    return {
+        "equiv_depth": equiv_depth,
+        "is_repetitive": repetitive,
+        "si_group": si_group,
+        "rnt": rnt,
+        "total_time": total_time,
+        "ndl": ndl,
+        "is_deco": is_deco,
+        "stops": stops,
+        "group": group,
+    }
+
+
+def _step(state, index, dive):
+    """Önceki durumdan (grup, yüzeye çıkış dakikası, uçuş yasağı sonu) bir sonraki dalışı hesaplar."""
+    depth_ft, bottom_time, surface_interval, altitude_ft = _unpack(dive)
+    prev_group, surfaced_at, no_fly_until = state
+    if surface_interval is None:
+        if prev_group is not None:
+            raise ValueError(f"{index}. dalış için satıh fasılası (surface_interval) verilmeli.")
+        surface_interval = 0
+
+    start = surfaced_at + surface_interval
+    result = evaluate_dive(depth_ft, bottom_time, altitude_ft, prev_group, surface_interval)
+    end = start + bottom_time + sum(result["stops"].values())
+
+    no_fly_hours = DiveLogic.get_no_fly_time(result["is_deco"])
+    no_fly_until = max(no_fly_until, end + no_fly_hours * 60)
+
+    alerts = []
+    if prev_group is not None and surface_interval < SAFETY_RULES["MIN_SURFACE_INTERVAL"]:
+        alerts.append(f"Satıh fasılası {SAFETY_RULES['MIN_SURFACE_INTERVAL']} dakikadan kısa.")
+    if result["is_deco"] and not result["stops"] and result["group"] == "Z":
+        alerts.append("Dekompresyon tablosunda karşılık yok; en riskli grup (Z) kabul edildi.")
+
+    result.update({
+        "index": index,
+        "depth_ft": depth_ft,
+        "bottom_time": bottom_time,
+        "surface_interval": surface_interval,
+        "altitude_ft": altitude_ft,
+        "start_minute": start,
+        "end_minute": end,
+        "no_fly_until": no_fly_until,
+        "alerts": alerts,
+    })
+    return result, (result["group"], end, no_fly_until)
+
+
+def iter_series(dives, start_group=None):
+    """
+    Dalış akışını tek geçişte işler ve her dalışın sonucunu sırayla üretir.
+    Dakikalar serinin başlangıcından itibaren sayılır; yalnızca son durum tutulur.
+    """
+    state = (start_group, 0, 0)
+    for index, dive in enumerate(dives):
+        result, state = _step(state, index, dive)
+        yield result
+
+
+class DiveSeries:
+    """
+    Düzenlenebilir dalış zinciri. Her dalıştan sonraki durum saklanır; N. dalış
+    değiştiğinde yalnızca N ve sonrası yeniden hesaplanır.
+    """
+
+    def __init__(self, dives=(), start_group=None):
+        self.start_group = start_group
+        self._dives = list(dives)
+        self._results = []  # Geçerli (hesaplanmış) önek
+        self._states = []   # _results[i] sonrasındaki zincir durumu
+
+    def __len__(self):
+        return len(self._dives)
+
+    def _invalidate(self, index):
+        del self._results[index:]
+        del self._states[index:]
+
+    def append(self, dive):
+        self._dives.append(dive)
+
+    def replace(self, index, dive):
+        self._dives[index] = dive
+        self._invalidate(index)
+
+    def insert(self, index, dive):
+        self._dives.insert(index, dive)
+        self._invalidate(index)
+
+    def remove(self, index):
+        del self._dives[index]
+        self._invalidate(index)
+
+    def results(self):
+        """Önbellekteki sonuçları verir, geçersiz kalan kısmı kaldığı yerden hesaplar."""
+        yield from self._results
+        index = len(self._results)
+        state = self._states[-1] if self._states else (self.start_group, 0, 0)
+        while index < len(self._dives):
+            result, state = _step(state, index, self._dives[index])
+            self._results.append(result)
+            self._states.append(state)
+            yield result
+            index += 1
+
+    def last(self):
+        """Zincirin son dalışının sonucunu döner (boşsa None)."""
+        result = None
+        for result in self.results():
+            pass
+        return result
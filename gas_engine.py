@@ -0,0 +1,89 @@
+import numpy as np
+from data_storage import SAFETY_RULES
+
+# ==========================================
+# SEGMENT TABANLI GAZ TÜKETİMİ
+# ==========================================
+# Dalış profili iniş, dip, çıkış ve her deko durağı olarak bölümlere ayrılır;
+# tüketim her bölümün ortalama mutlak basıncı (ATA) ile süresinin çarpımı
+# üzerinden toplanır. US Navy tanımına göre dip zamanı inişi de kapsar.
+# Bir profilin toplam ATA-dakikası tek sayı olduğundan ekip (SAC) x tüp
+# yapılandırması matrisi tek bir dış çarpımla hesaplanır.
+
+DEFAULT_SAC = 20.0          # L/dk, yüzey tüketim oranı
+DEFAULT_RESERVE = 1 / 3     # Tüp kapasitesinin rezerv payı (üçte bir kuralı)
+
+
+def _ata(depth_ft):
+    return depth_ft / 33 + 1
+
+
+def dive_segments(depth_ft, bottom_time, stops=None):
+    """
+    Profili (etiket, başlangıç_ft, bitiş_ft, dakika) bölümlerine ayırır.
+    stops: {durak_derinliği_ft: dakika}; süresi sıfır olan duraklar atlanır.
+    """
+    descent_rate = SAFETY_RULES["DESCENT_RATE"]
+    ascent_rate = SAFETY_RULES["ASCENT_RATE"]
+    depth_ft = max(0.0, float(depth_ft))
+    bottom_time = max(0.0, float(bottom_time))
+
+    descent = min(depth_ft / descent_rate, bottom_time)
+    segments = [
+        ("İniş", 0.0, depth_ft, descent),
+        ("Dip", depth_ft, depth_ft, bottom_time - descent),
+    ]
+    current = depth_ft
+    for stop_depth, minutes in sorted((stops or {}).items(), key=lambda x: int(x[0]), reverse=True):
+        stop_depth = float(stop_depth)
+        if minutes <= 0 or stop_depth >= current:
+            continue
+        segments.append(("Çıkış", current, stop_depth, (current - stop_depth) / ascent_rate))
+        segments.append((f"{stop_depth:g} ft Durağı", stop_depth, stop_depth, float(minutes)))
+        current = stop_depth
+    segments.append(("Çıkış", current, 0.0, current / ascent_rate))
+    return segments
+
+
+def ata_minutes(segments):
+    """Bölümlerin ortalama ATA x süre toplamı."""
+    return sum(_ata((start + end) / 2) * minutes for _, start, end, minutes in segments)
+
+
+def gas_usage(depth_ft, bottom_time, stops=None, sac=DEFAULT_SAC):
+    """Tek dalgıç için toplam gaz tüketimi (litre)."""
+    return sac * ata_minutes(dive_segments(depth_ft, bottom_time, stops))
+
+
+def team_gas_plan(depth_ft, bottom_time, sac_rates, tank_volumes, tank_pressures,
+                  stops=None, reserve_fraction=DEFAULT_RESERVE):
+    """
+    Ekipteki her dalgıç (SAC) ile her tüp yapılandırması (hacim L, basınç bar)
+    için gaz planını tek seferde hesaplar.
+
+    Dönen sözlükteki diziler:
+      usage          [dalgıç]        toplam tüketim (L)
+      available      [tüp]           tüpteki gaz (L)
+      remaining      [dalgıç, tüp]   dalış sonunda kalan gaz (L)
+      reserve_margin [dalgıç, tüp]   kalan gaz - rezerv (L); negatifse rezerv bozulur
+      sufficient     [dalgıç, tüp]   reserve_margin >= 0
+    """
+    sac = np.atleast_1d(np.asarray(sac_rates, dtype=float))
+    volumes, pressures = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(tank_volumes, dtype=float)),
+        np.atleast_1d(np.asarray(tank_pressures, dtype=float)),
+    )
+    exposure = ata_minutes(dive_segments(depth_ft, bottom_time, stops))
+
+    usage = sac * exposure
+    available = volumes * pressures
+    remaining = available[None, :] - usage[:, None]
+    margin = remaining - reserve_fraction * available[None, :]
+    return {
+        "ata_minutes": exposure,
+        "usage": usage,
+        "available": available,
+        "remaining": remaining,
+        "reserve_margin": margin,
+        "sufficient": margin >= 0,
+    }
@@ -0,0 +1,172 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dive_logic import DiveLogic
+
+# ==========================================
+# İSTEĞE BAĞLI ÖLÇÜMLEME (PROFILING)
+# ==========================================
+# Varsayılan olarak kapalıdır; enable() çağrıldığında ya da DALIS_PROFILE=1
+# ortam değişkeniyle açılır. Açıkken DiveLogic metotları sarmalanır ve her
+# fonksiyon için çağrı sayısı, toplam/en uzun süre ve tablo ıskaları (tablo
+# dışına düşen sorgular) sayılır. Arayüzler kendi bölümlerini timed() ile ölçer.
+
+ENV_VAR = "DALIS_PROFILE"
+
+_WRAPPED = (
+    "get_altitude_correction", "get_ndl", "get_deco_details", "get_group_letter",
+    "get_new_group_after_si", "is_repetitive", "calculate_rnt", "get_max_bottom_time",
+    "get_min_surface_interval", "get_no_fly_time",
+)
+
+_lock = threading.Lock()
+_stats = {}     # ad -> [çağrı, toplam_ns, en_uzun_ns]
+_misses = {}    # ad -> ıska sayısı
+_originals = {}  # son enable() anındaki orijinaller; disable() bunları geri yükler
+_enabled = False
+
+
+def _is_miss(name, args, result, orig):
+    """
+    Sorgunun tablo dışına düşüp düşmediğini (varsayılan değere döndüğünü) belirler.
+    orig, sarmalayıcının kendi orijinal fonksiyon eşlemesidir.
+    """
+    if name == "get_ndl":
+        return result == 0  # 190 ft üzeri
+    if name == "get_deco_details":
+        return result is None  # AIR_DECO_DATA'da satır yok
+    if name == "calculate_rnt":
+        return result == 0
+    if name == "get_group_letter":
+        # 'Z' ancak NDL aşıldıysa ya da derinlik tablo dışındaysa ıskadır
+        return result == 'Z' and args[1] > orig["get_ndl"](args[0])
+    if name == "get_new_group_after_si":
+        return not orig["is_repetitive"](*args)
+    if name == "get_min_surface_interval":
+        return result is None
+    return False
+
+
+def _wrap(name, func, originals):
+    clock = time.perf_counter_ns
+
+    def wrapper(*args, **kwargs):
+        t0 = clock()
+        result = func(*args, **kwargs)
+        elapsed = clock() - t0
+        miss = _is_miss(name, args, result, originals)
+        with _lock:
+            entry = _stats.setdefault(name, [0, 0, 0])
+            entry[0] += 1
+            entry[1] += elapsed
+            if elapsed > entry[2]:
+                entry[2] = elapsed
+            if miss:
+                _misses[name] = _misses.get(name, 0) + 1
+        return result
+
+    wrapper.__name__ = func.__name__
+    wrapper.__doc__ = func.__doc__
+    return wrapper
+
+
+def enable():
+    """DiveLogic metotlarını ölçüm sarmalayıcılarıyla değiştirir."""
+    global _enabled, _originals
+    with _lock:
+        if _enabled:
+            return
+        # Her enable() yeni bir eşleme kurar; sarmalayıcılar ona bağlı kalır,
+        # disable() sırasında hâlâ çalışan bir sarmalayıcı orijinallere erişebilir
+        originals = {name: DiveLogic.__dict__[name].__func__ for name in _WRAPPED}
+        for name, func in originals.items():
+            setattr(DiveLogic, name, staticmethod(_wrap(name, func, originals)))
+        _originals = originals
+        _enabled = True
+
+
+def disable():
+    """Orijinal DiveLogic metotlarını geri yükler (sayaçlar korunur)."""
+    global _enabled
+    with _lock:
+        if not _enabled:
+            return
+        for name, func in _originals.items():
+            setattr(DiveLogic, name, staticmethod(func))
+        _enabled = False
+
+
+def enable_from_env():
+    """DALIS_PROFILE ortam değişkeni ayarlıysa ölçümü açar."""
+    if os.environ.get(ENV_VAR, "").strip().lower() in ("1", "true", "yes", "on"):
+        enable()
+    return _enabled
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+        _misses.clear()
+
+
+@contextmanager
+def timed(name):
+    """Arayüz bölümlerini (tablo çizimi, log yazma vb.) ölçer; ölçüm kapalıyken işlem yapmaz."""
+    if not _enabled:
+        yield
+        return
+    t0 = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter_ns() - t0
+        with _lock:
+            entry = _stats.setdefault(name, [0, 0, 0])
+            entry[0] += 1
+            entry[1] += elapsed
+            if elapsed > entry[2]:
+                entry[2] = elapsed
+
+
+def snapshot():
+    """Anlık sayaçları sözlük olarak döner (süreler saniye cinsinden)."""
+    with _lock:
+        functions = {
+            name: {
+                "calls": calls,
+                "total_s": total / 1e9,
+                "per_call_us": total / calls / 1e3 if calls else 0.0,
+                "max_us": longest / 1e3,
+                "table_misses": _misses.get(name, 0),
+            }
+            for name, (calls, total, longest) in sorted(_stats.items())
+        }
+    return {"enabled": _enabled, "functions": functions}
+
+
+def to_json(indent=2):
+    return json.dumps(snapshot(), indent=indent, ensure_ascii=False)
+
+
+def to_prometheus(prefix="dalis"):
+    """Sayaçları Prometheus metin biçiminde döner."""
+    data = snapshot()["functions"]
+    metrics = (
+        ("calls_total", "counter", "Fonksiyon çağrı sayısı", "calls", 1),
+        ("call_seconds_total", "counter", "Toplam çalışma süresi (saniye)", "total_s", 1),
+        ("call_seconds_max", "gauge", "En uzun tek çağrı (saniye)", "max_us", 1e-6),
+        ("table_miss_total", "counter", "Tablo dışına düşen sorgu sayısı", "table_misses", 1),
+    )
+    lines = []
+    for suffix, kind, help_text, key, scale in metrics:
+        lines.append(f"# HELP {prefix}_{suffix} {help_text}")
+        lines.append(f"# TYPE {prefix}_{suffix} {kind}")
+        for name, entry in data.items():
+            lines.append(f'{prefix}_{suffix}{{function="{name}"}} {entry[key] * scale:.9g}')
+    return "\n".join(lines) + "\n"
@@ -1,8 +1,19 @@
+import queue
+import threading
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import messagebox, ttk
 from datetime import datetime
 from dive_logic import DiveLogic
 from data_storage import SAFETY_RULES
+from dive_log_store import open_store
+import instrumentation
+from gas_engine import gas_usage
+from compliance import check_egm_compliance
+from plan_engine import PlanEngine
+
+LIVE_DEBOUNCE_MS = 400  # Canlı kipte son tuş vuruşundan sonra hesaplamaya kadar beklenen süre
+POLL_MS = 50            # İşçi sonuçlarının arayüz iş parçacığında kontrol aralığı
 
 class DiveApp:
     def __init__(self, root):
@@ -17,6 +28,26 @@ class DiveApp:
         self.next_depth_f_var = tk.StringVar()
         self.last_group_letter = "A"  
         self._lock = False 
+        self.last_records = {}  # Dalış tipine göre son hesaplanan kaydın tipli alanları
+        self.log_store = open_store()
+        # Karar ızgarası (decision_grid.bin) mmap ile açılır; yoksa ya da eskimişse bir kez üretilir
+        try:
+            self.grid = DiveLogic.open_grid()
+        except OSError:
+            self.grid = None  # Dosya yazılamıyorsa tablolardan hesaplanır
+
+        # --- Arka Plan Hesaplama ---
+        # Girdiler arayüz iş parçacığında okunur, plan işçi iş parçacığında hesaplanır
+        # ve sonuç kuyruktan root.after ile alınıp çizilir. Her sekmenin nesil sayacı
+        # vardır; yeni istek geldiğinde eski (bayat) istekler hesaplanmaz/çizilmez.
+        self.engine = PlanEngine(check_egm_compliance)
+        self.live_var = tk.BooleanVar(value=False)
+        self._jobs = queue.Queue()
+        self._results = queue.Queue()
+        self._generation = {"ILK DALIS": 0, "MUKERRER DALIS": 0}
+        self._debounce = {}
+        self._log_executor = ThreadPoolExecutor(max_workers=1)
+        threading.Thread(target=self._worker, daemon=True).start()
 
         # --- Sekme Yapısı ---
         self.notebook = ttk.Notebook(root)
@@ -37,39 +68,101 @@ class DiveApp:
         self.next_depth_m_var.trace_add("write", self.update_next_from_meters)
         self.next_depth_f_var.trace_add("write", self.update_next_from_feet)
 
+        # Canlı kip tetikleyicileri
+        for var in (self.depth_m_var, self.depth_f_var):
+            var.trace_add("write", lambda *args: self.schedule_live("ILK DALIS"))
+        for var in (self.next_depth_m_var, self.next_depth_f_var):
+            var.trace_add("write", lambda *args: self.schedule_live("MUKERRER DALIS"))
+        for entry in (self.ent_personnel, self.ent_altitude, self.ent_time, self.ent_gas_type,
+                      self.ent_tank_vol1, self.ent_gas_press1):
+            entry.bind("<KeyRelease>", lambda e: self.schedule_live("ILK DALIS"))
+        for entry in (self.ent_si, self.ent_next_time, self.ent_tank_vol2, self.ent_gas_press2):
+            entry.bind("<KeyRelease>", lambda e: self.schedule_live("MUKERRER DALIS"))
+        self.combo_system.bind("<<ComboboxSelected>>", lambda e: self.schedule_live())
+        self.root.after(POLL_MS, self._poll_results)
+
     def save_to_log(self, content, dive_type="ILK DALIS"):
+        # Kayıt arayüzde hazırlanır, diske yazma arka planda yapılır; sonuç mesajı _poll_results'ta gösterilir
+        record = dict(self.last_records.get(dive_type, {}), dive_type=dive_type, report=content.strip(),
+                      diver=self.ent_diver.get().strip(), timestamp=datetime.now())
+        future = self._log_executor.submit(self._save_to_log, record)
+        future.add_done_callback(lambda f: self._results.put(("log", f.exception())))
+
+    def _save_to_log(self, record):
+        with instrumentation.timed("gui.save_to_log"):
+            self.log_store.write(record)
+
+    # --- ARKA PLAN HESAPLAMA ---
+    def schedule_live(self, dive_type=None):
+        """Canlı kip açıksa hesaplamayı erteler (debounce); art arda gelen değişikliklerde yalnızca sonuncusu hesaplanır."""
+        if not self.live_var.get():
+            return
+        for kind in ((dive_type,) if dive_type else tuple(self._generation)):
+            pending = self._debounce.pop(kind, None)
+            if pending is not None:
+                self.root.after_cancel(pending)
+            self._debounce[kind] = self.root.after(LIVE_DEBOUNCE_MS, lambda k=kind: self._submit(k, explicit=False))
+
+    def _submit(self, dive_type, explicit):
+        """Girdileri okuyup işçiye yeni nesil bir istek gönderir. Canlı kipte hatalı girdi sessizce atlanır."""
+        pending = self._debounce.pop(dive_type, None)
+        if pending is not None:
+            self.root.after_cancel(pending)
         try:
-            with open("dive_logs.txt", "a", encoding="utf-8") as f:
-                f.write(f"\n{'#'*50}\nKAYIT TARIHI: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\nDALIS TIPI: {dive_type}\n{content}\n{'#'*50}\n")
-            messagebox.showinfo("Başarılı", "Rapor kaydedildi.")
-        except Exception as e:
-            messagebox.showerror("Hata", f"Log hatası: {e}")
-
-    def check_egm_compliance(self, dive_system, depth_m, depth_f, gas_o2, personnel):
-        """Yönergelerdeki verilerin programa adaptasyonu"""
-        alerts = []
-        if dive_system == "SCUBA":
-            if depth_f > 140: alerts.append("❌ KRİTİK: Scuba ile maksimum derinlik sınırı 140 ft (42m) aşılamaz!")
-            if personnel < 3: alerts.append("👥 EKİP: Scuba dalışlarında en az 3 personel bulunmalıdır.")
-        elif dive_system == "SİDS":
-            if depth_f > 190: alerts.append("❌ KRİTİK: SİDS maksimum derinlik sınırı 190 ft (58m) aşıldı!")
-            elif depth_f > 140: alerts.append("⚠️ UYARI: 140 ft üzeri için en rütbeli kurbağa adamın yazılı izni şarttır.")
-            if personnel < 4: alerts.append("👥 EKİP: 10m altı için dahi en az 4 personel gereklidir.")
-            if depth_f > 33 and personnel < 7: alerts.append("👥 EKİP: 10m üzeri derinlikte ekip en az 7 kişi olmalıdır.")
-        elif dive_system == "NİTROKS":
+            params = self._read_single_inputs() if dive_type == "ILK DALIS" else self._read_repeat_inputs()
+        except ValueError as e:
+            if explicit:
+                if dive_type == "ILK DALIS": messagebox.showerror("Hata", "Girişleri kontrol edin.")
+                else: messagebox.showerror("Hata", f"Hata: {e}")
+            return
+        self._generation[dive_type] += 1
+        self._jobs.put((dive_type, self._generation[dive_type], params, explicit))
+
+    def _worker(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            dive_type, generation, params, explicit = job
+            if generation != self._generation[dive_type]:
+                continue  # Daha yeni bir istek var; bayat istek hesaplanmaz
             try:
-                o2 = int(gas_o2)
-                if o2 == 32 and depth_m > 33: alerts.append("❌ MEVZUAT: %32 Nitroks için derinlik sınırı 33 metredir.")
-                if o2 == 36 and depth_m > 28: alerts.append("❌ MEVZUAT: %36 Nitroks için derinlik sınırı 28 metredir.")
-            except: pass
-            alerts.append("ℹ️ İlk nitroks dalışı max 150 dk olabilir.")
-        elif dive_system == "KDDS":
-            if depth_m > 91: alerts.append("❌ KRİTİK: KDDS maksimum derinlik sınırı 91m aşıldı!")
-            if depth_m > 42:
-                alerts.append("⚠️ 42m üzeri için en kıdemli personelin yazılı izni gerekir.")
-                alerts.append("🩺 KRİTİK: Sualtı hekimi ve tazyik odası bulundurulması zorunludur.")
-            if personnel < 4: alerts.append("👥 EKİP: KDDS için en az 4 personel gereklidir.")
-        return alerts
+                if dive_type == "ILK DALIS":
+                    with instrumentation.timed("gui.calculate_dive"):
+                        plan = self.engine.cached(("gui.single",) + params, lambda: self._plan_single(*params))
+                else:
+                    with instrumentation.timed("gui.calculate_repeated_dive"):
+                        plan = self.engine.cached(("gui.repetitive",) + params, lambda: self._plan_repeat(*params))
+                error = None
+            except Exception as e:
+                plan, error = None, e
+            self._results.put(("plan", dive_type, generation, params, explicit, plan, error))
+
+    def _poll_results(self):
+        try:
+            while True:
+                item = self._results.get_nowait()
+                if item[0] == "log":
+                    if item[1] is None: messagebox.showinfo("Başarılı", "Rapor kaydedildi.")
+                    else: messagebox.showerror("Hata", f"Log hatası: {item[1]}")
+                    continue
+                _, dive_type, generation, params, explicit, plan, error = item
+                if generation != self._generation[dive_type]:
+                    continue  # Bu arada yeni istek gönderildi
+                if error is not None:
+                    if explicit: messagebox.showerror("Hata", f"Hata: {error}")
+                elif dive_type == "ILK DALIS":
+                    self._render_single(params, plan)
+                else:
+                    self._render_repeat(params, plan)
+        except queue.Empty:
+            pass
+        self.root.after(POLL_MS, self._poll_results)
+
+    def shutdown(self):
+        """İşçiyi durdurur ve bekleyen log yazmalarının bitmesini bekler."""
+        self._jobs.put(None)
+        self._log_executor.shutdown(wait=True)
 
     def setup_tab1(self):
         main_frame = tk.Frame(self.tab1)
@@ -106,11 +199,16 @@ class DiveApp:
         tk.Label(input_frame, text="Gaz Basıncı (Bar):", fg="darkgreen").grid(row=8, column=0, sticky="w")
         self.ent_gas_press1 = tk.Entry(input_frame); self.ent_gas_press1.insert(0, "200"); self.ent_gas_press1.grid(row=8, column=1)
 
+        tk.Label(input_frame, text="Dalgıç:").grid(row=9, column=0, sticky="w")
+        self.ent_diver = tk.Entry(input_frame); self.ent_diver.grid(row=9, column=1)
+
         self.btn_calc = tk.Button(input_frame, text="HESAPLA & DENETLE", command=self.calculate_dive, bg="#003366", fg="white", font=('Arial', 10, 'bold'))
-        self.btn_calc.grid(row=9, column=0, columnspan=2, pady=10, sticky="we")
+        self.btn_calc.grid(row=10, column=0, columnspan=2, pady=10, sticky="we")
 
         self.btn_log1 = tk.Button(input_frame, text="LOG KAYDET", command=lambda: self.save_to_log(self.txt_result.get(1.0, tk.END), "ILK DALIS"), bg="#555555", fg="white")
-        self.btn_log1.grid(row=10, column=0, columnspan=2, pady=5, sticky="we")
+        self.btn_log1.grid(row=11, column=0, columnspan=2, pady=5, sticky="we")
+
+        tk.Checkbutton(input_frame, text="Canlı Hesaplama", variable=self.live_var, command=self.schedule_live).grid(row=12, column=0, columnspan=2, sticky="w")
 
         output_frame = tk.Frame(main_frame)
         output_frame.pack(side="right", fill="both", expand=True, padx=5)
@@ -118,60 +216,93 @@ class DiveApp:
         self.txt_result.pack(fill="both", expand=True)
 
     def calculate_dive(self):
-        try:
-            alt = float(self.ent_altitude.get() or 0)
-            depth_f = float(self.depth_f_var.get())
-            depth_m = float(self.depth_m_var.get())
-            b_time = float(self.ent_time.get())
-            gas_o2 = self.ent_gas_type.get()
-            sys_type = self.combo_system.get()
-            pers_count = int(self.ent_personnel.get() or 0)
-            t_vol = float(self.ent_tank_vol1.get() or 0)
-            t_press = float(self.ent_gas_press1.get() or 0)
-
-            equiv_depth = DiveLogic.get_altitude_correction(depth_f, alt)
-            ndl = DiveLogic.get_ndl(equiv_depth)
-            
-            self.txt_result.delete(1.0, tk.END)
-            self.txt_result.insert(tk.END, f"{'='*45}\n ANALİZ VE MEVZUAT RAPORU\n{'='*45}\n\n")
-            
-            compliance_alerts = self.check_egm_compliance(sys_type, depth_m, depth_f, gas_o2, pers_count)
-            if not compliance_alerts:
-                self.txt_result.insert(tk.END, "✅ Planlanan dalış EGM yönergelerine UYGUNDUR.\n\n", "success")
-            else:
-                for alert in compliance_alerts: self.txt_result.insert(tk.END, f"{alert}\n", "warning")
-                self.txt_result.insert(tk.END, "\n")
-
-            self.txt_result.insert(tk.END, f"Seçilen Sistem: {sys_type}\nDerinlik: {depth_f:.1f} ft ({depth_m} m)\nNDL Sınırı: {ndl} dk\n")
-            
+        self._submit("ILK DALIS", explicit=True)
+
+    def _read_single_inputs(self):
+        return (
+            float(self.ent_altitude.get() or 0),
+            float(self.depth_f_var.get()),
+            float(self.depth_m_var.get()),
+            float(self.ent_time.get()),
+            self.ent_gas_type.get(),
+            self.combo_system.get(),
+            int(self.ent_personnel.get() or 0),
+            float(self.ent_tank_vol1.get() or 0),
+            float(self.ent_gas_press1.get() or 0),
+        )
+
+    def _plan_single(self, alt, depth_f, depth_m, b_time, gas_o2, sys_type, pers_count, t_vol, t_press):
+        """İlk dalış planı (işçi iş parçacığında çalışır; Tk nesnelerine dokunmaz)."""
+        compliance_alerts = check_egm_compliance(sys_type, depth_m, depth_f, gas_o2, pers_count)
+
+        if self.grid is not None:
+            # Tam sayı ft/dk girdilerde tek ofset okuması; diğerlerinde ızgara tablolara düşer
+            ndl, _, group, grid_stops = self.grid.plan(depth_f, b_time, alt)
             is_deco = b_time > ndl
-            if is_deco:
-                self.txt_result.insert(tk.END, "DURUM: !!! DEKOMPRESYONLU DALIŞ !!!\n", "warning")
-                deco_data = DiveLogic.get_deco_details(equiv_depth, b_time)
-                if deco_data:
-                    for sd, dur in sorted(deco_data["stops"].items(), key=lambda x: int(x[0]), reverse=True):
-                        if dur > 0: self.txt_result.insert(tk.END, f" -> {sd} ft Durağı: {dur} dk\n")
-                    group = deco_data["final_group"]
-                else: group = "Z"
-            else:
-                self.txt_result.insert(tk.END, "DURUM: GÜVENLİ (NDL DAHİLİ)\n")
-                group = DiveLogic.get_group_letter(equiv_depth, b_time)
-
-            # Hava Analizi Çıktısı
-            ata = (depth_f / 33) + 1
-            est_usage = 20 * ata * b_time # Ortalama 20 L/dk üzerinden
-            rem_gas = (t_vol * t_press) - est_usage
-            self.txt_result.insert(tk.END, f"\n--- HAVA ANALİZİ ---\n")
-            self.txt_result.insert(tk.END, f"Mevcut Gaz: {t_vol * t_press:.0f} Litre\n")
-            self.txt_result.insert(tk.END, f"Tahmini Tüketim: {est_usage:.0f} Litre\n")
-            self.txt_result.insert(tk.END, f"Kalan Gaz: {max(0, rem_gas):.0f} Litre\n")
-
-            self.txt_result.insert(tk.END, f"\nDalış Sonu Grup: {group}\n")
-            self.last_group_letter = group
-            self.lbl_current_group.config(text=group)
-            self.txt_result.tag_config("warning", foreground="red", font=('Arial', 10, 'bold'))
-            self.txt_result.tag_config("success", foreground="green", font=('Arial', 10, 'bold'))
-        except ValueError: messagebox.showerror("Hata", "Girişleri kontrol edin.")
+            stops = {sd: dur for sd, dur in grid_stops.items() if dur > 0}
+            return {"ndl": ndl, "alerts": compliance_alerts, "is_deco": is_deco, "stops": stops,
+                    "group": group, "gas_usage": gas_usage(depth_f, b_time, stops)}
+
+        equiv_depth = DiveLogic.get_altitude_correction(depth_f, alt)
+        ndl = DiveLogic.get_ndl(equiv_depth)
+        is_deco = b_time > ndl
+        stops = {}
+        if is_deco:
+            deco_data = DiveLogic.get_deco_details(equiv_depth, b_time)
+            if deco_data:
+                stops = {sd: dur for sd, dur in deco_data["stops"].items() if dur > 0}
+                group = deco_data["final_group"]
+            else: group = "Z"
+        else:
+            group = DiveLogic.get_group_letter(equiv_depth, b_time)
+
+        # Hava Analizi (iniş, dip, çıkış ve deko durakları; 20 L/dk SAC)
+        return {"ndl": ndl, "alerts": compliance_alerts, "is_deco": is_deco, "stops": stops,
+                "group": group, "gas_usage": gas_usage(depth_f, b_time, stops)}
+
+    def _render_single(self, params, plan):
+        alt, depth_f, depth_m, b_time, gas_o2, sys_type, pers_count, t_vol, t_press = params
+        ndl, compliance_alerts, is_deco, stops, group = plan["ndl"], plan["alerts"], plan["is_deco"], plan["stops"], plan["group"]
+
+        self.txt_result.delete(1.0, tk.END)
+        self.txt_result.insert(tk.END, f"{'='*45}\n ANALİZ VE MEVZUAT RAPORU\n{'='*45}\n\n")
+
+        if not compliance_alerts:
+            self.txt_result.insert(tk.END, "✅ Planlanan dalış EGM yönergelerine UYGUNDUR.\n\n", "success")
+        else:
+            for alert in compliance_alerts: self.txt_result.insert(tk.END, f"{alert}\n", "warning")
+            self.txt_result.insert(tk.END, "\n")
+
+        self.txt_result.insert(tk.END, f"Seçilen Sistem: {sys_type}\nDerinlik: {depth_f:.1f} ft ({depth_m} m)\nNDL Sınırı: {ndl} dk\n")
+
+        if is_deco:
+            self.txt_result.insert(tk.END, "DURUM: !!! DEKOMPRESYONLU DALIŞ !!!\n", "warning")
+            for sd, dur in sorted(stops.items(), key=lambda x: int(x[0]), reverse=True):
+                self.txt_result.insert(tk.END, f" -> {sd} ft Durağı: {dur} dk\n")
+        else:
+            self.txt_result.insert(tk.END, "DURUM: GÜVENLİ (NDL DAHİLİ)\n")
+
+        # Hava Analizi Çıktısı
+        est_usage = plan["gas_usage"]
+        rem_gas = (t_vol * t_press) - est_usage
+        self.txt_result.insert(tk.END, f"\n--- HAVA ANALİZİ ---\n")
+        self.txt_result.insert(tk.END, f"Mevcut Gaz: {t_vol * t_press:.0f} Litre\n")
+        self.txt_result.insert(tk.END, f"Tahmini Tüketim: {est_usage:.0f} Litre\n")
+        self.txt_result.insert(tk.END, f"Kalan Gaz: {max(0, rem_gas):.0f} Litre\n")
+
+        self.txt_result.insert(tk.END, f"\nDalış Sonu Grup: {group}\n")
+        group_changed = group != self.last_group_letter
+        self.last_group_letter = group
+        self.lbl_current_group.config(text=group)
+        self.last_records["ILK DALIS"] = {
+            "system": sys_type, "depth_ft": depth_f, "depth_m": depth_m, "bottom_time": b_time,
+            "altitude_ft": alt, "gas_o2": gas_o2, "personnel": pers_count, "group_letter": group,
+            "rnt": 0, "is_deco": is_deco, "deco_stops": dict(stops), "alerts": list(compliance_alerts),
+        }
+        self.txt_result.tag_config("warning", foreground="red", font=('Arial', 10, 'bold'))
+        self.txt_result.tag_config("success", foreground="green", font=('Arial', 10, 'bold'))
+        if group_changed:
+            self.schedule_live("MUKERRER DALIS")  # Önceki grup değişti; mükerrer plan da yenilenir
 
     def setup_tab2(self):
         main_frame = tk.Frame(self.tab2)
@@ -205,42 +336,95 @@ class DiveApp:
         self.btn_calc_repeat = tk.Button(input_frame, text="MÜKERRER ANALİZİ YAP", command=self.calculate_repeated_dive, bg="#2E7D32", fg="white", font=('Arial', 10, 'bold'))
         self.btn_calc_repeat.grid(row=7, column=0, columnspan=2, pady=15, sticky="we")
 
+        self.btn_log2 = tk.Button(input_frame, text="LOG KAYDET", command=lambda: self.save_to_log(self.txt_result_repeat.get(1.0, tk.END), "MUKERRER DALIS"), bg="#555555", fg="white")
+        self.btn_log2.grid(row=8, column=0, columnspan=2, pady=5, sticky="we")
+
+        tk.Checkbutton(input_frame, text="Canlı Hesaplama", variable=self.live_var, command=self.schedule_live).grid(row=9, column=0, columnspan=2, sticky="w")
+
         output_frame = tk.Frame(main_frame)
         output_frame.pack(side="right", fill="both", expand=True, padx=5)
         self.txt_result_repeat = tk.Text(output_frame, font=('Consolas', 11), bg="#f1f8e9")
         self.txt_result_repeat.pack(fill="both", expand=True)
 
     def calculate_repeated_dive(self):
-        try:
-            si_str = self.ent_si.get()
-            si_min = (int(si_str.split(":")[0])*60 + int(si_str.split(":")[1])) if ":" in si_str else float(si_str)
-            next_depth_f = float(self.next_depth_f_var.get())
-            next_time = float(self.ent_next_time.get() or 0)
-            t_vol = float(self.ent_tank_vol2.get() or 0)
-            t_press = float(self.ent_gas_press2.get() or 0)
-            
-            new_group = DiveLogic.get_new_group_after_si(self.last_group_letter, si_min)
-            rnt = DiveLogic.calculate_rnt(next_depth_f, new_group)
-            total_time = rnt + next_time
-            
-            self.txt_result_repeat.delete(1.0, tk.END)
-            self.txt_result_repeat.insert(tk.END, f"{'='*40}\n MÜKERRER DALIŞ SONUCU\n{'='*40}\n\n")
-            self.txt_result_repeat.insert(tk.END, f"SI Sonrası Grup: {new_group}\nArtık Azot Zamanı (RNT): {rnt} dk\n")
-            self.txt_result_repeat.insert(tk.END, f"Planlanan Dip Zamanı: {next_time} dk\n")
-            self.txt_result_repeat.insert(tk.END, f"TOPLAM HESAP ZAMANI: {total_time} dk\n")
-
-            # Mükerrer Hava Analizi
-            ata = (next_depth_f / 33) + 1
-            est_usage = 20 * ata * next_time
-            self.txt_result_repeat.insert(tk.END, f"\n--- HAVA ANALİZİ ---\n")
-            self.txt_result_repeat.insert(tk.END, f"Mevcut Gaz: {t_vol * t_press:.0f} L\n")
-            self.txt_result_repeat.insert(tk.END, f"Tahmini Tüketim: {est_usage:.0f} L\n")
-            self.txt_result_repeat.insert(tk.END, f"Kalan Gaz: {max(0, (t_vol*t_press)-est_usage):.0f} L\n")
-
-            alerts = self.check_egm_compliance(self.combo_system.get(), next_depth_f/3.28, next_depth_f, 21, int(self.ent_personnel.get() or 0))
-            for alert in alerts: self.txt_result_repeat.insert(tk.END, f"\n{alert}", "warning")
-            self.txt_result_repeat.tag_config("warning", foreground="red")
-        except Exception as e: messagebox.showerror("Hata", f"Hata: {e}")
+        self._submit("MUKERRER DALIS", explicit=True)
+
+    def _read_repeat_inputs(self):
+        si_str = self.ent_si.get()
+        si_min = (int(si_str.split(":")[0])*60 + int(si_str.split(":")[1])) if ":" in si_str else float(si_str)
+        return (
+            self.last_group_letter,
+            si_min,
+            float(self.next_depth_f_var.get()),
+            float(self.ent_next_time.get() or 0),
+            float(self.ent_tank_vol2.get() or 0),
+            float(self.ent_gas_press2.get() or 0),
+            self.combo_system.get(),
+            int(self.ent_personnel.get() or 0),
+        )
+
+    def _plan_repeat(self, last_group, si_min, next_depth_f, next_time, t_vol, t_press, sys_type, pers_count):
+        """Mükerrer dalış planı (işçi iş parçacığında çalışır; Tk nesnelerine dokunmaz)."""
+        new_group = DiveLogic.get_new_group_after_si(last_group, si_min)
+        # Fasıla Tablo 9-8 sınırını aşmışsa dalış mükerrer değildir; RNT düşülmez
+        rnt = DiveLogic.calculate_rnt(next_depth_f, new_group) if DiveLogic.is_repetitive(last_group, si_min) else 0
+        total_time = rnt + next_time
+        ndl = DiveLogic.get_ndl(next_depth_f)
+
+        # Mükerrer Hava Analizi (toplam hesap zamanına göre deko durakları dahil)
+        rep_stops = {}
+        if total_time > ndl:
+            deco_rep = DiveLogic.get_deco_details(next_depth_f, total_time)
+            if deco_rep: rep_stops = deco_rep["stops"]
+            final_group = deco_rep["final_group"] if deco_rep and "final_group" in deco_rep else "Z"
+        else:
+            final_group = DiveLogic.get_group_letter(next_depth_f, total_time)
+
+        return {
+            "new_group": new_group, "rnt": rnt, "total_time": total_time, "is_deco": total_time > ndl,
+            "final_group": final_group, "stops": {k: v for k, v in rep_stops.items() if v > 0},
+            # Maksimum izinli değerler (ters tablo sorguları)
+            "max_bottom_time": DiveLogic.get_max_bottom_time(next_depth_f, last_group, si_min),
+            "min_surface_interval": DiveLogic.get_min_surface_interval(last_group, next_depth_f, next_time),
+            "gas_usage": gas_usage(next_depth_f, next_time, rep_stops),
+            "alerts": check_egm_compliance(sys_type, next_depth_f/3.28, next_depth_f, 21, pers_count),
+        }
+
+    def _render_repeat(self, params, plan):
+        last_group, si_min, next_depth_f, next_time, t_vol, t_press, sys_type, pers_count = params
+        new_group, rnt, total_time = plan["new_group"], plan["rnt"], plan["total_time"]
+
+        self.txt_result_repeat.delete(1.0, tk.END)
+        self.txt_result_repeat.insert(tk.END, f"{'='*40}\n MÜKERRER DALIŞ SONUCU\n{'='*40}\n\n")
+        self.txt_result_repeat.insert(tk.END, f"SI Sonrası Grup: {new_group}\nArtık Azot Zamanı (RNT): {rnt} dk\n")
+        self.txt_result_repeat.insert(tk.END, f"Planlanan Dip Zamanı: {next_time} dk\n")
+        self.txt_result_repeat.insert(tk.END, f"TOPLAM HESAP ZAMANI: {total_time} dk\n")
+        self.txt_result_repeat.insert(tk.END, f"Dalış Sonu Grup: {plan['final_group']}\n")
+
+        max_bt, min_si = plan["max_bottom_time"], plan["min_surface_interval"]
+        self.txt_result_repeat.insert(tk.END, f"\n--- MAKSİMUM İZİNLİ ---\n")
+        self.txt_result_repeat.insert(tk.END, f"Maks. Dip Zamanı (NDL içi): {max_bt} dk\n")
+        if min_si is not None:
+            self.txt_result_repeat.insert(tk.END, f"NDL İçin Min. Yüzey Aralığı: {min_si // 60}:{min_si % 60:02d}\n")
+        else:
+            self.txt_result_repeat.insert(tk.END, "NDL İçin Min. Yüzey Aralığı: Mümkün değil\n")
+
+        est_usage = plan["gas_usage"]
+        self.txt_result_repeat.insert(tk.END, f"\n--- HAVA ANALİZİ ---\n")
+        self.txt_result_repeat.insert(tk.END, f"Mevcut Gaz: {t_vol * t_press:.0f} L\n")
+        self.txt_result_repeat.insert(tk.END, f"Tahmini Tüketim: {est_usage:.0f} L\n")
+        self.txt_result_repeat.insert(tk.END, f"Kalan Gaz: {max(0, (t_vol*t_press)-est_usage):.0f} L\n")
+
+        alerts = plan["alerts"]
+        for alert in alerts: self.txt_result_repeat.insert(tk.END, f"\n{alert}", "warning")
+        self.last_records["MUKERRER DALIS"] = {
+            "system": sys_type, "depth_ft": next_depth_f, "depth_m": next_depth_f / 3.28084,
+            "bottom_time": next_time, "gas_o2": "21", "personnel": pers_count,
+            "group_letter": plan["final_group"], "rnt": rnt, "is_deco": plan["is_deco"],
+            "deco_stops": plan["stops"],
+            "alerts": list(alerts),
+        }
+        self.txt_result_repeat.tag_config("warning", foreground="red")
 
     def _update_conversions(self, source_var, target_var, factor, is_multiply):
         if not self._lock:
@@ -257,7 +441,17 @@ class DiveApp:
     def update_next_from_meters(self, *args): self._update_conversions(self.next_depth_m_var, self.next_depth_f_var, 3.28084, True)
     def update_next_from_feet(self, *args): self._update_conversions(self.next_depth_f_var, self.next_depth_m_var, 3.28084, False)
 
+def _on_close(root, app):
+    # Bekleyen log yazmaları tamamlanır; ölçüm açıksa sonuçlar kapanışta dosyaya yazılır
+    app.shutdown()
+    if instrumentation.is_enabled():
+        with open("dalis_profile.json", "w", encoding="utf-8") as f:
+            f.write(instrumentation.to_json())
+    root.destroy()
+
 if __name__ == "__main__":
+    instrumentation.enable_from_env()
     root = tk.Tk()
     app = DiveApp(root)
+    root.protocol("WM_DELETE_WINDOW", lambda: _on_close(root, app))
     root.mainloop()
\ No newline at end of file
@@ -0,0 +1,151 @@
+import threading
+from collections import OrderedDict
+from dive_logic import DiveLogic
+from gas_engine import gas_usage
+
+# ==========================================
+# ÖNBELLEKLİ PLAN MOTORU
+# ==========================================
+# Arayüzlerin ürettiği dalış raporlarını normalize edilmiş girdilerle anahtarlanan,
+# boyutu sınırlı bir LRU önbellekte tutar. Aynı girdiler için rapor yeniden
+# hesaplanmaz. Tek bir motor, birden fazla oturum/iş parçacığı tarafından
+# paylaşılabilir.
+
+DEFAULT_CACHE_SIZE = 512
+
+
+def _num(value):
+    """Sayısal girdiyi normalize eder: tam sayı değerler int, diğerleri float olur (40 ve 40.0 aynı anahtar)."""
+    value = float(value or 0)
+    return int(value) if value.is_integer() else value
+
+
+class PlanEngine:
+    def __init__(self, compliance_check, maxsize=DEFAULT_CACHE_SIZE):
+        """
+        compliance_check: (sistem, derinlik_m, derinlik_ft, gaz, personel) -> uyarı listesi
+        """
+        self.compliance_check = compliance_check
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cached(self, key, compute):
+        with self._lock:
+            report = self._cache.get(key)
+            if report is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return report
+            self.misses += 1
+        report = compute()
+        with self._lock:
+            self._cache[key] = report
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return report
+
+    def cached(self, key, compute):
+        """
+        Arayüzlerin kendi hesaplarını aynı LRU önbellekte tutar. Anahtardaki
+        sayısal değerler normalize edilir (40 ve 40.0 aynı anahtar).
+        """
+        key = tuple(_num(v) if isinstance(v, (int, float)) and not isinstance(v, bool) else v for v in key)
+        return self._cached(key, compute)
+
+    def stats(self):
+        """Önbellek sayaçlarını döner."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._cache), "maxsize": self.maxsize}
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def single_dive(self, system, depth_m, bottom_time, altitude_ft, gas, personnel, tank_volume, tank_pressure):
+        """İlk dalış raporu (app.py 'HESAPLA VE RAPORLA' akışı)."""
+        key = ("single", str(system), _num(depth_m), _num(bottom_time), _num(altitude_ft),
+               str(gas).strip(), int(personnel or 0), _num(tank_volume), _num(tank_pressure))
+        return self._cached(key, lambda: self._single_dive(*key[1:]))
+
+    def repetitive_dive(self, system, prev_group, si_minutes, depth_m, planned_time):
+        """Mükerrer dalış raporu (app.py 'MÜKERRER ANALİZ YAP' akışı)."""
+        key = ("repetitive", str(system), str(prev_group), _num(si_minutes), _num(depth_m), _num(planned_time))
+        return self._cached(key, lambda: self._repetitive_dive(*key[1:]))
+
+    def _single_dive(self, system, depth_m, bottom_time, altitude_ft, gas, personnel, tank_volume, tank_pressure):
+        depth_f = depth_m * 3.28084
+        alerts = tuple(self.compliance_check(system, depth_m, depth_f, gas, personnel))
+
+        equiv_depth = DiveLogic.get_altitude_correction(depth_f, altitude_ft)
+        ndl = DiveLogic.get_ndl(equiv_depth)
+
+        is_deco = bottom_time > ndl
+        deco_found = False
+        stops = ()
+        if is_deco:
+            deco = DiveLogic.get_deco_details(equiv_depth, bottom_time)
+            if deco and "stops" in deco:
+                deco_found = True
+                stops = tuple((k, v) for k, v in deco["stops"].items() if v > 0)
+                group = deco["final_group"]
+            else: group = "Z"
+        else:
+            group = DiveLogic.get_group_letter(equiv_depth, bottom_time)
+
+        # Hava Analizi (iniş, dip, çıkış ve deko durakları; 20 L/dk SAC)
+        total_gas = tank_volume * tank_pressure
+        usage = gas_usage(depth_f, bottom_time, dict(stops))
+
+        return {
+            "depth_f": depth_f,
+            "alerts": alerts,
+            "equiv_depth": equiv_depth,
+            "ndl": ndl,
+            "is_deco": is_deco,
+            "deco_found": deco_found,
+            "stops": stops,
+            "group": group,
+            "total_gas": total_gas,
+            "gas_usage": usage,
+            "gas_remaining": total_gas - usage,
+        }
+
+    def _repetitive_dive(self, system, prev_group, si_minutes, depth_m, planned_time):
+        depth_f = depth_m * 3.28084
+        new_group = DiveLogic.get_new_group_after_si(prev_group, si_minutes)
+        # Fasıla Tablo 9-8 sınırını aşmışsa dalış mükerrer değildir; RNT düşülmez
+        repetitive = DiveLogic.is_repetitive(prev_group, si_minutes)
+        rnt = DiveLogic.calculate_rnt(depth_f, new_group) if repetitive else 0
+        total_time = rnt + planned_time
+        ndl = DiveLogic.get_ndl(depth_f)
+
+        deco_found = False
+        stops = ()
+        if total_time > ndl:
+            deco = DiveLogic.get_deco_details(depth_f, total_time)
+            if deco:
+                deco_found = True
+                stops = tuple((k, v) for k, v in deco["stops"].items() if v > 0)
+            final_group = deco["final_group"] if deco and "final_group" in deco else "Z"
+        else:
+            final_group = DiveLogic.get_group_letter(depth_f, total_time)
+
+        return {
+            "depth_f": depth_f,
+            "new_group": new_group,
+            "is_repetitive": repetitive,
+            "final_group": final_group,
+            "rnt": rnt,
+            "total_time": total_time,
+            "ndl": ndl,
+            "is_deco": total_time > ndl,
+            "deco_found": deco_found,
+            "stops": stops,
+            "max_bottom_time": DiveLogic.get_max_bottom_time(depth_f, prev_group, si_minutes),
+            "min_surface_interval": DiveLogic.get_min_surface_interval(prev_group, depth_f, planned_time),
+            "alerts": tuple(self.compliance_check(system, depth_m, depth_f, "21", 4)),
+        }
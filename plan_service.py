@@ -0,0 +1,392 @@
+import argparse
+import asyncio
+import json
+import math
+import sys
+import time
+from collections import deque
+from urllib.parse import urlsplit
+from dive_logic import DiveLogic
+from batch_planner import plan_batch, STOP_DEPTHS
+from compliance import check_egm_compliance, blocking_alerts
+
+# ==========================================
+# YEREL JSON PLANLAMA SERVİSİ
+# ==========================================
+# Streamlit/Tk arayüzü açmadan betiklerin ve izleme araçlarının plan
+# sorgulayabilmesi için localhost'ta çalışan, yalnızca standart kütüphane
+# (asyncio) kullanan bir HTTP/1.1 sunucusu. Bağlantılar keep-alive'dır.
+# Kısa bir pencere (varsayılan 2 ms) içinde gelen ilk ve mükerrer dalış
+# istekleri tek bir plan_batch çağrısında birlikte değerlendirilir; eşzamanlı
+# işlenen istek sayısı sınırlıdır ve her uç nokta için gecikme istatistiği tutulur.
+#
+#   POST /plan/single      {"depth_ft"|"depth_m", "bottom_time", "altitude_ft"?, "system"?, "personnel"?, "gas_o2"?}
+#   POST /plan/repetitive  {"depth_ft"|"depth_m", "bottom_time", "prev_group"?, "si_minutes"?, "altitude_ft"?}
+#   POST /compliance       {"system", "depth_ft"|"depth_m", "gas_o2"?, "personnel"?}
+#   GET  /stats, GET /health
+#
+# POST gövdeleri tek bir nesne ya da nesne listesi olabilir; yanıt aynı biçimdedir.
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_WINDOW_MS = 2.0
+DEFAULT_MAX_BATCH = 4096
+DEFAULT_MAX_CONCURRENCY = 64
+IDLE_TIMEOUT = 15.0          # sn, boşta kalan keep-alive bağlantısı kapatılır
+MAX_BODY = 1 << 20           # bayt
+_LATENCY_WINDOW = 2048       # uç nokta başına tutulan son gecikme örneği
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+def _number(item, key, default=None):
+    """Alanı sonlu bir sayı olarak okur; toplu değerlendirmeye yalnızca geçerli satırlar gider."""
+    value = item.get(key, default)
+    if value is None:
+        raise ValueError(f"{key} gerekli.")
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError(f"{key} sayı olmalı.")
+    value = float(value)
+    if not math.isfinite(value):
+        raise ValueError(f"{key} sonlu bir sayı olmalı.")
+    return value
+
+
+def _depth_ft(item):
+    if "depth_ft" in item:
+        return _number(item, "depth_ft")
+    if "depth_m" in item:
+        return _number(item, "depth_m") * 3.28084
+    raise ValueError("depth_ft ya da depth_m gerekli.")
+
+
+def _items(body):
+    """Gövdeyi (nesneler, liste_mi) olarak döner."""
+    data = json.loads(body or b"{}")
+    if isinstance(data, dict):
+        return [data], False
+    if isinstance(data, list) and all(isinstance(d, dict) for d in data):
+        return data, True
+    raise ValueError("Gövde bir JSON nesnesi ya da nesne listesi olmalı.")
+
+
+def _evaluate_rows(rows):
+    """(derinlik_ft, toplam_zaman, irtifa_ft) satırlarını tek plan_batch çağrısıyla çözer."""
+    depth, total_time, altitude = zip(*rows)
+    frame = plan_batch(depth, total_time, altitude)
+    stops = [frame[f"stop_{s}ft"].tolist() for s in STOP_DEPTHS]
+    columns = zip(
+        frame["equiv_depth_ft"].tolist(), frame["ndl"].tolist(), frame["is_deco"].tolist(),
+        frame["final_group"].tolist(), frame["total_stop_time"].tolist(), frame["deco_row_found"].tolist(),
+    )
+    results = []
+    for i, (equiv, ndl, is_deco, group, total_stop, found) in enumerate(columns):
+        results.append({
+            "equiv_depth_ft": equiv,
+            "ndl": ndl,
+            "is_deco": is_deco,
+            "group": group,
+            "stops": {str(s): col[i] for s, col in zip(STOP_DEPTHS, stops) if col[i] > 0},
+            "total_stop_time": total_stop,
+            "deco_row_found": found,
+        })
+    return results
+
+
+class _Coalescer:
+    """Pencere içinde gelen satırları toplayıp tek toplu değerlendirmeye gönderir."""
+
+    def __init__(self, window_s, max_batch):
+        self.window_s = window_s
+        self.max_batch = max_batch
+        self.batches = 0
+        self.rows = 0
+        self.largest = 0
+        self._queue = asyncio.Queue()
+
+    async def submit(self, rows):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((rows, future))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self._queue.get()]
+            count = len(items[0][0])
+            deadline = loop.time() + self.window_s
+            while count < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                items.append(item)
+                count += len(item[0])
+
+            rows = [row for batch, _ in items for row in batch]
+            try:
+                # Hesap iş parçacığında yapılır; olay döngüsü yeni istekleri kabul etmeye devam eder
+                results = await loop.run_in_executor(None, _evaluate_rows, rows)
+            except Exception as e:
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.batches += 1
+            self.rows += len(rows)
+            self.largest = max(self.largest, len(rows))
+            offset = 0
+            for batch, future in items:
+                if not future.done():
+                    future.set_result(results[offset:offset + len(batch)])
+                offset += len(batch)
+
+
+class PlanService:
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, window_ms=DEFAULT_WINDOW_MS,
+                 max_batch=DEFAULT_MAX_BATCH, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+        self.host = host
+        self.port = port
+        self.window_ms = window_ms
+        self.max_batch = max_batch
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self._latency = {}   # uç nokta -> deque(saniye)
+        self._counts = {}    # uç nokta -> [istek, hata]
+        self._routes = {
+            "/plan/single": ("POST", self._plan_single),
+            "/plan/repetitive": ("POST", self._plan_repetitive),
+            "/compliance": ("POST", self._compliance),
+            "/stats": ("GET", self._stats),
+            "/health": ("GET", self._health),
+        }
+        self._server = None
+        self._coalescer = None
+        self._batch_task = None
+        self._slots = None
+
+    async def start(self):
+        """Sunucuyu başlatır; port 0 verilmişse atanan portu self.port'a yazar."""
+        self._coalescer = _Coalescer(self.window_ms / 1000, self.max_batch)
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._batch_task = asyncio.get_running_loop().create_task(self._coalescer.run())
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+        self._batch_task.cancel()
+
+    # --- HTTP ---
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    line = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                if not line.strip():
+                    break
+                parts = line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    header = await reader.readline()
+                    if header in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = header.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                if len(parts) != 3:
+                    await self._respond(writer, 400, {"error": "Geçersiz istek satırı."}, False)
+                    break
+
+                method, target, version = parts
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._respond(writer, 400, {"error": "Geçersiz Content-Length."}, False)
+                    break
+                if length > MAX_BODY:
+                    await self._respond(writer, 413, {"error": "Gövde çok büyük."}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                status, payload = await self._dispatch(method, urlsplit(target).path, body)
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status, payload, keep_alive):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + data)
+        await writer.drain()
+
+    async def _dispatch(self, method, path, body):
+        route = self._routes.get(path)
+        if route is None:
+            return 404, {"error": f"Bilinmeyen uç nokta: {path}"}
+        if method != route[0]:
+            return 405, {"error": f"{path} yalnızca {route[0]} kabul eder."}
+
+        t0 = time.perf_counter()
+        async with self._slots:
+            self.in_flight += 1
+            try:
+                status, payload = 200, await route[1](body)
+            except (ValueError, KeyError, TypeError) as e:
+                status, payload = 400, {"error": f"Geçersiz girdi: {e}"}
+            except Exception as e:
+                status, payload = 500, {"error": str(e)}
+            finally:
+                self.in_flight -= 1
+        counts = self._counts.setdefault(path, [0, 0])
+        counts[0] += 1
+        counts[1] += status != 200
+        self._latency.setdefault(path, deque(maxlen=_LATENCY_WINDOW)).append(time.perf_counter() - t0)
+        return status, payload
+
+    # --- UÇ NOKTALAR ---
+    async def _plan_single(self, body):
+        items, many = _items(body)
+        if not items:
+            return []
+        rows = [(_depth_ft(i), _number(i, "bottom_time"), _number(i, "altitude_ft", 0)) for i in items]
+        results = await self._coalescer.submit(rows)
+        for item, (depth_ft, _, _), result in zip(items, rows, results):
+            result["depth_ft"] = depth_ft
+            if "system" in item:
+                result["alerts"] = check_egm_compliance(
+                    item["system"], depth_ft / 3.28084, depth_ft, item.get("gas_o2", "21"), int(item.get("personnel", 4)))
+        return results if many else results[0]
+
+    async def _plan_repetitive(self, body):
+        items, many = _items(body)
+        if not items:
+            return []
+        rows, extras = [], []
+        for item in items:
+            depth_ft = _depth_ft(item)
+            bottom_time = _number(item, "bottom_time")
+            altitude_ft = _number(item, "altitude_ft", 0)
+            prev_group = item.get("prev_group")
+            si_minutes = _number(item, "si_minutes") if prev_group is not None else None
+
+            # Mükerrer kısım satır başına tablo sorgusu, NDL/deko kısmı toplu değerlendirmede
+            equiv = DiveLogic.get_altitude_correction(depth_ft, altitude_ft)
+            repetitive = prev_group is not None and DiveLogic.is_repetitive(prev_group, si_minutes)
+            si_group = DiveLogic.get_new_group_after_si(prev_group, si_minutes) if repetitive else None
+            rnt = DiveLogic.calculate_rnt(equiv, si_group) if repetitive else 0
+            rows.append((depth_ft, rnt + bottom_time, altitude_ft))
+            extras.append({
+                "depth_ft": depth_ft,
+                "is_repetitive": repetitive,
+                "si_group": si_group,
+                "rnt": rnt,
+                "total_time": rnt + bottom_time,
+                "max_bottom_time": DiveLogic.get_max_bottom_time(equiv, prev_group, si_minutes),
+                "min_surface_interval": (DiveLogic.get_min_surface_interval(prev_group, equiv, bottom_time)
+                                         if prev_group is not None else None),
+            })
+        results = await self._coalescer.submit(rows)
+        for result, extra in zip(results, extras):
+            result.update(extra)
+        return results if many else results[0]
+
+    async def _compliance(self, body):
+        items, many = _items(body)
+        results = []
+        for item in items:
+            depth_ft = _depth_ft(item)
+            depth_m = float(item["depth_m"]) if "depth_m" in item else depth_ft / 3.28084
+            alerts = check_egm_compliance(item["system"], depth_m, depth_ft, item.get("gas_o2", "21"),
+                                          int(item.get("personnel", 4)))
+            blocking = blocking_alerts(alerts)
+            results.append({"alerts": alerts, "blocking": blocking, "allowed": not blocking})
+        return results if many else results[0]
+
+    async def _health(self, body):
+        return {"status": "ok"}
+
+    async def _stats(self, body):
+        return self.stats()
+
+    def stats(self):
+        """Uç nokta başına istek/hata sayısı ve gecikme yüzdelikleri (ms) ile toplu değerlendirme sayaçları."""
+        endpoints = {}
+        for path, samples in self._latency.items():
+            ordered = sorted(samples)
+            n = len(ordered)
+            requests, errors = self._counts[path]
+            endpoints[path] = {
+                "requests": requests,
+                "errors": errors,
+                "mean_ms": sum(ordered) / n * 1e3,
+                "p50_ms": ordered[n // 2] * 1e3,
+                "p99_ms": ordered[min(n - 1, int(n * 0.99))] * 1e3,
+                "max_ms": ordered[-1] * 1e3,
+            }
+        c = self._coalescer
+        return {
+            "endpoints": endpoints,
+            "batches": {
+                "count": c.batches,
+                "rows": c.rows,
+                "mean_size": c.rows / c.batches if c.batches else 0.0,
+                "largest": c.largest,
+                "window_ms": self.window_ms,
+            },
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="DiveLogic planları için yerel JSON servisi")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="dinlenecek adres (varsayılan 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="dinlenecek port (varsayılan 8765)")
+    parser.add_argument("--window-ms", type=float, default=DEFAULT_WINDOW_MS, help="istek birleştirme penceresi (ms)")
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH, help="bir toplu değerlendirmedeki en fazla satır")
+    parser.add_argument("--max-concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY, help="eşzamanlı işlenen en fazla istek")
+    args = parser.parse_args(argv)
+
+    service = PlanService(args.host, args.port, args.window_ms, args.max_batch, args.max_concurrency)
+
+    async def serve():
+        await service.start()
+        print(f"Planlama servisi: http://{service.host}:{service.port}")
+        await service.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,396 @@
+import argparse
+import csv
+import math
+import os
+import sys
+import xml.etree.ElementTree as ET
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from itertools import chain, groupby
+from dive_series import iter_series
+
+# ==========================================
+# DALIŞ BİLGİSAYARI PROFİL AKTARIMI
+# ==========================================
+# CSV ve UDDF profil dosyaları satır satır (generator zinciri) okunur:
+#
+#   örnekler (zaman, derinlik)  ->  dalış özetleri (maks. derinlik, dip zamanı)
+#                               ->  iter_series (irtifa düzeltmesi, grup, deko, RNT)
+#
+# Bir dalış için yalnızca o ana kadarki en büyük derinlik ve birkaç zaman damgası
+# tutulur; dosya boyundan bağımsız olarak bellek kullanımı sabittir. UDDF'de
+# işlenen her XML düğümü ağaçtan hemen çıkarılır. Çok sayıda dosya süreç
+# havuzunda paralel işlenir.
+#
+# Dip zamanı US Navy tanımına göre yüzeyden ayrılmadan dibi terk edişe kadar
+# geçen süredir (bir üst tam dakikaya yuvarlanır). Dibi terk anı, en büyük
+# derinliğin BOTTOM_BAND_FT içinde kalınan son örnek kabul edilir.
+
+FT_PER_M = 3.28084
+SURFACE_THRESHOLD_FT = 3.3   # Bu derinliğin altı "suda" sayılır
+BOTTOM_BAND_FT = 10.0
+
+_DATETIME_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%dT%H:%M",
+                     "%d.%m.%Y %H:%M:%S", "%d.%m.%Y %H:%M", "%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M")
+
+
+def _parse_datetime(text):
+    text = (text or "").strip()
+    if not text:
+        return None
+    try:
+        return datetime.fromisoformat(text).replace(tzinfo=None)
+    except ValueError:
+        pass
+    for fmt in _DATETIME_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def _parse_clock(text):
+    """'s', 'm:ss' ya da 'h:mm:ss' biçimindeki süreyi (birimsiz sayı ise olduğu gibi) döner."""
+    parts = text.strip().split(":")
+    if len(parts) == 1:
+        return float(parts[0]), False
+    value = 0.0
+    for part in parts:
+        value = value * 60 + float(part)
+    return value, True
+
+
+class _ProfileReducer:
+    """Bir dalışın örneklerini sabit bellekle özetler."""
+
+    def __init__(self, bottom_band_ft=BOTTOM_BAND_FT):
+        self.bottom_band_ft = bottom_band_ft
+        self.samples = 0
+        self.max_depth = 0.0
+        self.first_wet = None    # Yüzeyden ayrılış (sn)
+        self.last_wet = None     # Yüzeye son varış öncesi son örnek (sn)
+        self.left_bottom = None  # Dibin terk edildiği son örnek (sn)
+
+    def add(self, seconds, depth_ft):
+        self.samples += 1
+        if depth_ft <= SURFACE_THRESHOLD_FT:
+            return
+        if self.first_wet is None:
+            self.first_wet = seconds
+        self.last_wet = seconds
+        if depth_ft > self.max_depth:
+            self.max_depth = depth_ft
+        # En büyük derinlik yalnızca artar; bant içindeki son örnek nihai maksimuma göre de doğrudur
+        if depth_ft >= self.max_depth - self.bottom_band_ft:
+            self.left_bottom = seconds
+
+    def summary(self):
+        if self.first_wet is None:
+            return None  # Hiç dalınmamış (yüzey kaydı)
+        return {
+            "max_depth_ft": round(self.max_depth, 1),
+            "bottom_time": math.ceil((self.left_bottom - self.first_wet) / 60),
+            "duration_s": self.last_wet - self.first_wet,
+            "samples": self.samples,
+        }
+
+
+# --- CSV ---
+def _find_column(header, *needles, exclude=()):
+    for i, name in enumerate(header):
+        lowered = name.lower()
+        if all(n in lowered for n in needles) and not any(x in lowered for x in exclude):
+            return i
+    return None
+
+
+def iter_csv_samples(path):
+    """
+    CSV profilini (dalış_no, başlangıç, saniye, derinlik_ft) örnekleri olarak üretir.
+    Başlıktan sütunlar ve birimler tanınır: derinlik 'ft' içeriyorsa feet, aksi
+    halde metre; zaman 'min' içeriyorsa dakika, aksi halde saniye ('m:ss' de olur).
+    Dalış numarası ve tarih/saat sütunları isteğe bağlıdır.
+    """
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        head = f.read(4096)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(head, delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        reader = csv.reader(f, dialect)
+        header = next(reader, None)
+        if header is None:
+            return
+        depth_col = _find_column(header, "depth")
+        time_col = _find_column(header, "sample", "time")
+        if time_col is None:
+            time_col = _find_column(header, "time", exclude=("date",))
+        if depth_col is None or time_col is None:
+            raise ValueError(f"{path}: zaman ve derinlik sütunları bulunamadı.")
+        dive_col = _find_column(header, "dive", exclude=("time", "depth"))
+        date_col = _find_column(header, "date")
+        clock_col = _find_column(header, "time", exclude=("sample", "date", "dive"))
+        if clock_col == time_col:
+            clock_col = None
+
+        depth_scale = 1.0 if "ft" in header[depth_col].lower() else FT_PER_M
+        time_scale = 60.0 if "min" in header[time_col].lower() else 1.0
+
+        for row in reader:
+            if len(row) <= max(depth_col, time_col) or not row[depth_col].strip():
+                continue
+            value, is_clock = _parse_clock(row[time_col])
+            # 'm:ss' biçimi dakika sütununda dakika:saniye, saniye sütununda zaten saniyedir
+            seconds = value if is_clock and time_scale == 60.0 else value * time_scale
+            start = None
+            if date_col is not None and date_col < len(row):
+                start = row[date_col] + (" " + row[clock_col] if clock_col is not None and clock_col < len(row) else "")
+            dive = row[dive_col] if dive_col is not None and dive_col < len(row) else None
+            yield dive, start, seconds, float(row[depth_col].replace(",", ".")) * depth_scale
+
+
+# --- UDDF ---
+def iter_uddf_samples(path):
+    """
+    UDDF dosyasını (dalış_id, başlangıç, saniye, derinlik_ft) örnekleri olarak üretir.
+    Her dalışın ilk örneğinden önce (dalış_id, bilgiler, None, None) üretilir;
+    bilgiler başlangıç zamanını, satıh fasılasını (sn) ve irtifayı (m) içerir.
+    """
+    stack = []
+    dive_id, info, announced = None, {}, False
+    depth = divetime = None
+    for event, elem in ET.iterparse(path, events=("start", "end")):
+        tag = elem.tag.rsplit("}", 1)[-1]
+        if event == "start":
+            stack.append(elem)
+            if tag == "dive":
+                dive_id, info, announced = elem.get("id"), {}, False
+            elif tag == "waypoint":
+                depth = divetime = None
+            continue
+
+        stack.pop()
+        parent = stack[-1].tag.rsplit("}", 1)[-1] if stack else None
+        text = (elem.text or "").strip()
+        if tag == "datetime" and parent == "informationbeforedive":
+            info["start"] = text
+        elif tag == "passedtime" and parent == "surfaceintervalbeforedive":
+            info["surface_interval_s"] = float(text)
+        elif tag == "altitude" and parent == "informationbeforedive":
+            info["altitude_m"] = float(text)
+        elif tag == "depth" and parent == "waypoint":
+            depth = float(text)
+        elif tag == "divetime" and parent == "waypoint":
+            divetime = float(text)
+        elif tag == "waypoint":
+            if not announced:
+                yield dive_id, info, None, None
+                announced = True
+            if depth is not None and divetime is not None:
+                yield dive_id, None, divetime, depth * FT_PER_M
+
+        # İşlenen düğüm ağaçtan çıkarılır; uzun profillerde bellek büyümez
+        if tag in ("waypoint", "dive") or parent in ("informationbeforedive", "surfaceintervalbeforedive"):
+            if stack:
+                stack[-1].remove(elem)
+
+
+# --- ÖZETLEME VE ZİNCİR ---
+def iter_dives(path, bottom_band_ft=BOTTOM_BAND_FT):
+    """Dosyadaki dalışları sırayla özetler (generator)."""
+    uddf = path.lower().endswith(".uddf")
+    samples = iter_uddf_samples(path) if uddf else iter_csv_samples(path)
+    current, info, reducer = object(), {}, None
+
+    def finish():
+        summary = reducer.summary() if reducer else None
+        if summary:
+            summary.update(dive=None if current is None else str(current), start=_parse_datetime(info.get("start")),
+                           surface_interval_s=info.get("surface_interval_s"), altitude_m=info.get("altitude_m"))
+        return summary
+
+    for dive, meta, seconds, depth_ft in samples:
+        if dive != current:
+            summary = finish()
+            if summary:
+                yield summary
+            current, info, reducer = dive, {}, _ProfileReducer(bottom_band_ft)
+        if seconds is None:
+            info.update(meta)  # UDDF dalış bilgileri
+            continue
+        if meta and "start" not in info:
+            info["start"] = meta
+        reducer.add(seconds, depth_ft)
+    summary = finish()
+    if summary:
+        yield summary
+
+
+def _series_inputs(summaries, altitude_ft):
+    """Özetleri iter_series girdisine çevirir; satıh fasılası zaman damgalarından ya da UDDF'den alınır."""
+    prev_end = None
+    for s in summaries:
+        if s["surface_interval_s"] is not None:
+            interval = s["surface_interval_s"] / 60
+        elif s["start"] is not None and prev_end is not None:
+            interval = (s["start"] - prev_end).total_seconds() / 60
+        else:
+            interval = None  # Bilinmiyor: dalış yeni bir seri başlatır
+        prev_end = None if s["start"] is None else s["start"] + timedelta(seconds=s["duration_s"])
+        alt = altitude_ft if s["altitude_m"] is None else s["altitude_m"] * FT_PER_M
+        yield s, (s["max_depth_ft"], s["bottom_time"], interval, alt)
+
+
+def _split_series(pairs):
+    """
+    (özet, dalış) akışını fasılası bilinmeyen her dalışta yeni bir seriye böler
+    ve (başlangıç grubu kullanılsın mı, seri) çiftleri üretir. Akış belleğe alınmaz.
+    """
+    series_id = 0
+
+    def key(pair):
+        nonlocal series_id
+        if pair[1][2] is None:
+            series_id += 1
+        return series_id
+
+    for _, series in groupby(pairs, key):
+        first = next(series)
+        yield first[1][2] is not None, chain((first,), series)
+
+
+def import_file(path, altitude_ft=0, start_group=None, bottom_band_ft=BOTTOM_BAND_FT):
+    """
+    Bir profil dosyasındaki dalışları sırayla planlar ve her dalış için sonuç
+    sözlüğü üretir (generator): dosya/dalış bilgisi, maks. derinlik, dip zamanı,
+    eşdeğer derinlik, satıh fasılası sonrası grup, RNT, NDL, deko durakları ve
+    dalış sonu grubu. Aynı dosyadaki ardışık dalışlar mükerrer olarak zincirlenir;
+    satıh fasılası bilinmeyen dalış önceki dalışlardan bağımsız yeni bir seri başlatır.
+    """
+    pairs = _series_inputs(iter_dives(path, bottom_band_ft), altitude_ft)
+    for use_start_group, series in _split_series(pairs):
+        yield from _import_series(path, series, start_group if use_start_group else None)
+
+
+def _import_series(path, series, start_group):
+    # iter_series girdiyi sırayla tükettiği için özetler geliş sırasıyla (FIFO) eşlenir
+    summaries = deque()
+
+    def inputs():
+        for summary, dive in series:
+            summaries.append((summary, dive[2]))
+            yield dive
+
+    for result in iter_series(inputs(), start_group):
+        summary, interval = summaries.popleft()
+        yield {
+            "file": os.path.basename(path),
+            "dive": summary["dive"],
+            "start": summary["start"],
+            "samples": summary["samples"],
+            "max_depth_ft": summary["max_depth_ft"],
+            "bottom_time": summary["bottom_time"],
+            "altitude_ft": result["altitude_ft"],
+            "surface_interval": interval,
+            "equiv_depth": result["equiv_depth"],
+            "is_repetitive": result["is_repetitive"],
+            "si_group": result["si_group"],
+            "rnt": result["rnt"],
+            "total_time": result["total_time"],
+            "ndl": result["ndl"],
+            "is_deco": result["is_deco"],
+            "stops": result["stops"],
+            "group": result["group"],
+            "alerts": result["alerts"],
+        }
+
+
+def _import_file_list(args):
+    """Süreç havuzu işçisi: dosyanın tüm dalış sonuçlarını liste olarak döner (dalış başına küçük kayıt)."""
+    path, altitude_ft, bottom_band_ft = args
+    try:
+        return path, list(import_file(path, altitude_ft, bottom_band_ft=bottom_band_ft)), None
+    except (OSError, ValueError, ET.ParseError) as e:
+        return path, [], str(e)
+
+
+def import_files(paths, altitude_ft=0, workers=None, bottom_band_ft=BOTTOM_BAND_FT):
+    """
+    Çok sayıda dosyayı paralel işler ve (dosya, sonuçlar, hata) üçlülerini dosya
+    sırasıyla üretir. workers=1 ise süreç havuzu kullanılmaz.
+    """
+    jobs = ((p, altitude_ft, bottom_band_ft) for p in paths)
+    if workers == 1:
+        yield from map(_import_file_list, jobs)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(_import_file_list, jobs, chunksize=8)
+
+
+def to_log_record(result, diver=None):
+    """Sonucu DiveLogStore kaydına çevirir."""
+    return {
+        "timestamp": result["start"] or datetime.now(),
+        "diver": diver,
+        "dive_type": "MUKERRER DALIS" if result["is_repetitive"] else "ILK DALIS",
+        "depth_ft": result["max_depth_ft"],
+        "depth_m": round(result["max_depth_ft"] / FT_PER_M, 1),
+        "bottom_time": result["bottom_time"],
+        "altitude_ft": result["altitude_ft"],
+        "group_letter": result["group"],
+        "rnt": result["rnt"],
+        "is_deco": result["is_deco"],
+        "deco_stops": result["stops"],
+        "alerts": result["alerts"],
+        "report": f"Dalış bilgisayarı aktarımı: {result['file']} / {result['dive']}",
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dalış bilgisayarı profillerinin (CSV/UDDF) toplu aktarımı")
+    parser.add_argument("paths", nargs="+", help="profil dosyaları ya da klasörler")
+    parser.add_argument("--altitude", type=float, default=0, help="dalış yeri irtifası (ft); UDDF'deki değer önceliklidir")
+    parser.add_argument("--workers", type=int, default=None, help="paralel süreç sayısı (varsayılan: işlemci sayısı)")
+    parser.add_argument("--store", metavar="DB", help="sonuçları bu kayıt veritabanına yaz")
+    parser.add_argument("--diver", help="kayıtlara yazılacak dalgıç adı")
+    args = parser.parse_args(argv)
+
+    def expand(paths):
+        for p in paths:
+            if os.path.isdir(p):
+                for name in sorted(os.listdir(p)):
+                    if name.lower().endswith((".csv", ".uddf")):
+                        yield os.path.join(p, name)
+            else:
+                yield p
+
+    store = None
+    if args.store:
+        from dive_log_store import DiveLogStore
+        store = DiveLogStore(args.store, batch_size=500)
+    files = dives = errors = 0
+    try:
+        for path, results, error in import_files(expand(args.paths), args.altitude, args.workers):
+            files += 1
+            if error:
+                errors += 1
+                print(f"HATA {path}: {error}")
+                continue
+            for r in results:
+                dives += 1
+                print(f"{r['file']:<24}{str(r['dive'] or '-'):>6}{r['max_depth_ft']:>8.1f} ft{r['bottom_time']:>5} dk"
+                      f"  RNT {r['rnt']:>3}  {'DEKO' if r['is_deco'] else 'NDL '}  grup {r['group']}")
+                if store:
+                    store.add(to_log_record(r, args.diver))
+    finally:
+        if store:
+            store.close()
+    print(f"{files} dosya, {dives} dalış, {errors} hata.")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
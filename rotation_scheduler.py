@@ -0,0 +1,154 @@
+import itertools
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dive_logic import DiveLogic
+from compliance import check_egm_compliance, blocking_alerts
+from data_storage import SAFETY_RULES
+
+# ==========================================
+# EKİP ROTASYON PLANLAYICISI
+# ==========================================
+# Dalgıç listesi (mevcut mükerrer grupları ile) ve görev listesi (derinlik,
+# çalışma süresi) alır; görevleri gün içindeki dalış slotlarına ve dalgıçlara
+# atayarak toplam verimli dip zamanını en büyük yapmaya çalışır.
+#
+# Her aday plan bir görev sırasıdır: k. görev k. slota yerleşir ve slotta o
+# an en çok dip zamanı verebilecek dalgıç seçilir. Her atama satıh fasılası
+# sonrası grup, RNT ve NDL ile sınırlanır (RNT + dip zamanı <= NDL), sistemin
+# EGM ekip/derinlik kuralları ihlal edilmez. Adaylar süreç havuzunda paralel
+# değerlendirilir; aday üretimi ve eşitlik bozma deterministiktir.
+
+DEFAULT_MAX_CANDIDATES = 5000
+_CHUNK_SIZE = 250
+
+
+def _dive_limit(group, surfaced_at, start, depth_ft):
+    """Dalgıcın verilen slotta NDL içinde kalabileceği en uzun dip zamanı ve SI sonrası grup/RNT."""
+    interval = start - surfaced_at
+    if group is not None and DiveLogic.is_repetitive(group, interval):
+        si_group = DiveLogic.get_new_group_after_si(group, interval)
+        rnt = DiveLogic.calculate_rnt(depth_ft, si_group)
+    else:
+        si_group, rnt = None, 0
+    return max(0, DiveLogic.get_ndl(depth_ft) - rnt), si_group, rnt
+
+
+def _simulate(order, roster, tasks, slot_times, allowed):
+    """Bir görev sırasını greedy olarak yerleştirir; (toplam verimli süre, atamalar) döner."""
+    min_si = SAFETY_RULES["MIN_SURFACE_INTERVAL"]
+    divers = [[d.get("group"), d.get("surfaced_at", 0 if d.get("group") else -math.inf)] for d in roster]
+    assignments = []
+    total = 0
+    for slot, task_index in enumerate(order):
+        depth_ft, work_time = tasks[task_index]
+        start = slot_times[slot]
+        if not allowed[task_index]:
+            continue
+        best = None
+        for i, (group, surfaced_at) in enumerate(divers):
+            if start - surfaced_at < min_si:
+                continue  # Dalgıç henüz sudan çıkmadı ya da fasıla yetersiz
+            limit, si_group, rnt = _dive_limit(group, surfaced_at, start, depth_ft)
+            productive = min(work_time, limit)
+            if productive <= 0:
+                continue
+            end_group = DiveLogic.get_group_letter(depth_ft, rnt + productive)
+            # En çok verimli süre; eşitlikte daha düşük son grup, sonra liste sırası
+            key = (productive, -ord(end_group), -i)
+            if best is None or key > best[0]:
+                best = (key, i, productive, si_group, rnt, end_group)
+        if best is None:
+            continue
+        _, i, productive, si_group, rnt, end_group = best
+        divers[i] = [end_group, start + productive]
+        total += productive
+        assignments.append({
+            "slot": slot, "start": start, "task": task_index, "depth_ft": depth_ft, "work_time": work_time,
+            "diver": roster[i]["name"], "productive_time": productive, "si_group": si_group,
+            "rnt": rnt, "end_group": end_group,
+        })
+    return total, assignments
+
+
+def _evaluate_chunk(payload):
+    """Süreç havuzunda çalışan işçi: bir aday grubundaki en iyi planı döner."""
+    start_index, orders, roster, tasks, slot_times, allowed = payload
+    best = None
+    for k, order in enumerate(orders):
+        total, assignments = _simulate(order, roster, tasks, slot_times, allowed)
+        # Eşit puanda düşük aday indeksi seçilir (deterministik)
+        if best is None or total > best[0]:
+            best = (total, start_index + k, assignments)
+    return best
+
+
+def _candidate_orders(tasks, max_candidates, seed):
+    """Aday görev sıraları: küçük problemlerde tüm permütasyonlar, aksi halde sabit tohumlu örneklem."""
+    n_tasks = len(tasks)
+    if math.factorial(n_tasks) <= max_candidates:
+        return [list(p) for p in itertools.permutations(range(n_tasks))]
+    rnd = random.Random(seed)
+    identity = list(range(n_tasks))
+    # Verilen sıra ve "derin görevler önce" (artık azot birikmeden) sezgisel adayları
+    deep_first = sorted(identity, key=lambda k: (-tasks[k][0], k))
+    orders = [identity] + ([deep_first] if deep_first != identity else [])
+    seen = {tuple(o) for o in orders}
+    while len(orders) < max_candidates:
+        order = identity[:]
+        rnd.shuffle(order)
+        if tuple(order) not in seen:
+            seen.add(tuple(order))
+            orders.append(order)
+    return orders
+
+
+def schedule_day(roster, tasks, slot_times, system="SCUBA", personnel=None,
+                 max_candidates=DEFAULT_MAX_CANDIDATES, workers=None, seed=0):
+    """
+    Günlük dalış rotasyonunu planlar.
+
+    roster     : [{"name": ..., "group": 'F' | None, "surfaced_at": dakika}, ...]
+                 group, dalgıcın güne taşıdığı mükerrer grup; surfaced_at o grubun
+                 alındığı çıkış zamanı (gün başından dakika, varsayılan: gün başı)
+    tasks      : [(derinlik_ft, çalışma_süresi_dk), ...]
+    slot_times : slot başlangıçları (gün başından dakika); en az görev sayısı kadar
+    personnel  : sahadaki toplam personel (varsayılan: dalgıç listesi uzunluğu)
+    """
+    if len(slot_times) < len(tasks):
+        raise ValueError("Slot sayısı görev sayısından az olamaz.")
+    roster = [dict(d) for d in roster]
+    tasks = [(float(d), float(t)) for d, t in tasks]
+    slot_times = sorted(slot_times)
+    crew = len(roster) if personnel is None else personnel
+
+    # Mevzuat: sınırı aşan ya da ekibi yetersiz görevler hiç atanmaz
+    violations = {}
+    for k, (depth_ft, _) in enumerate(tasks):
+        blocking = blocking_alerts(check_egm_compliance(system, depth_ft / 3.28084, depth_ft, "21", crew))
+        if blocking:
+            violations[k] = blocking
+    allowed = [k not in violations for k in range(len(tasks))]
+
+    orders = _candidate_orders(tasks, max_candidates, seed)
+    chunks = [
+        (i, orders[i:i + _CHUNK_SIZE], roster, tasks, slot_times, allowed)
+        for i in range(0, len(orders), _CHUNK_SIZE)
+    ]
+    if workers == 1 or len(chunks) == 1:
+        results = [_evaluate_chunk(c) for c in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            results = list(pool.map(_evaluate_chunk, chunks))
+
+    total, index, assignments = max(results, key=lambda r: (r[0], -r[1]))
+    assigned = {a["task"] for a in assignments}
+    return {
+        "total_productive_time": total,
+        "assignments": assignments,
+        "unassigned": [k for k in range(len(tasks)) if k not in assigned],
+        "violations": violations,
+        "candidates_evaluated": len(orders),
+        "best_candidate": index,
+    }